@@ -0,0 +1,47 @@
+# contacts.py
+# Player contact tracking with begin/stay/end events.
+#
+# Collision and the zone pass report what the player actually overlaps this
+# step (touch()). update() compares that with the previous step and calls
+# on_contact_begin / on_contact_stay / on_contact_end(level, player) on the
+# entities involved. Only entities that subscribe (a non-zero contact_events)
+# are ever reported, so the per-step cost follows the number of contacts, not
+# the number of things in the level.
+
+from __future__ import annotations
+
+
+# contact_events bits
+CONTACT_BEGIN = 1
+CONTACT_STAY = 2
+CONTACT_END = 4
+
+
+class ContactManager:
+    def __init__(self):
+        self.touching: dict[int, object] = {}  # id -> entity, as of the last update()
+        self._now: dict[int, object] = {}  # reported so far this step
+
+    def touch(self, ent):
+        # ent overlaps the player this step (reporting it twice is fine)
+        self._now[id(ent)] = ent
+
+    def update(self, level, player):
+        # Fire this step's events, in the order contacts were reported
+        now, before = self._now, self.touching
+        for key, ent in now.items():
+            if key not in before:
+                if ent.contact_events & CONTACT_BEGIN:
+                    ent.on_contact_begin(level, player)
+            elif ent.contact_events & CONTACT_STAY:
+                ent.on_contact_stay(level, player)
+        for key, ent in before.items():
+            if key not in now and ent.contact_events & CONTACT_END:
+                ent.on_contact_end(level, player)
+        self.touching = now
+        self._now = {}
+
+    def clear(self):
+        # Forget all contacts without firing anything (savestate restore)
+        self.touching = {}
+        self._now = {}
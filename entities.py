@@ -6,10 +6,16 @@ from __future__ import annotations
 import math
 import pygame as pg
 
+import hazards as hz
+from motion import ping_pong, fall_distance, due
+from contacts import CONTACT_BEGIN, CONTACT_STAY, CONTACT_END
+from sprites import render_text, spike_sprite, draw_conveyor_arrows, ARROW_PERIOD
+
 from settings import (
+    WIDTH, HEIGHT,
     GRAVITY, PLAYER_SPEED, PLAYER_JUMP, FRICTION,
     COYOTE_TIME, JUMP_BUFFER,
-    WHITE, ACCENT, RED, GREEN, CYAN, PURPLE, DARK
+    WHITE, ACCENT, GREEN, CYAN, PURPLE, DARK
 )
 
 Vec2 = pg.math.Vector2
@@ -21,12 +27,22 @@ Vec2 = pg.math.Vector2
 # Keeps the player centered while staying inside the level bounds.
 
 class Camera:
-    def __init__(self, world_w: int, world_h: int):
+    def __init__(self, world_w: int, world_h: int, view_w: int = WIDTH, view_h: int = HEIGHT):
         self.world_w = world_w
         self.world_h = world_h
+        self.view_w = view_w
+        self.view_h = view_h
         self.offset = Vec2(0, 0)
 
+    @property
+    def view_rect(self) -> pg.Rect:
+        # World-space area that is on screen (anything outside it can skip drawing)
+        return pg.Rect(int(self.offset.x), int(self.offset.y), self.view_w, self.view_h)
+
     def update(self, target_rect: pg.Rect, screen_w: int, screen_h: int):
+        self.view_w = screen_w
+        self.view_h = screen_h
+
         # Follow player
         x = target_rect.centerx - screen_w // 2
         y = target_rect.centery - screen_h // 2
@@ -74,6 +90,23 @@ class Player:
         self.dead = True
         self.death_reason = reason
 
+    def snapshot(self):
+        return (
+            self.rect.x, self.rect.y, self.vel.x, self.vel.y,
+            self.dead, self.death_reason,
+            self.coyote_t, self.jump_buffer_t,
+            self.on_ground, self.ground_obj,
+        )
+
+    def restore(self, state):
+        (
+            self.rect.x, self.rect.y, vx, vy,
+            self.dead, self.death_reason,
+            self.coyote_t, self.jump_buffer_t,
+            self.on_ground, self.ground_obj,
+        ) = state
+        self.vel.update(vx, vy)
+
     def update(self, dt: float, keys, level):
         if self.dead:
             return
@@ -123,9 +156,9 @@ class Player:
         self._move_and_collide(dt, level)
 
         # Carry the player with moving platforms (so you don't slip off)
-        if self.on_ground and self.ground_obj is not None and hasattr(self.ground_obj, "delta"):
-            self.rect.x += int(self.ground_obj.delta.x)
-            self.rect.y += int(self.ground_obj.delta.y)
+        if self.on_ground and self.ground_obj is not None and self.ground_obj.dynamic:
+            self.rect.x += self.ground_obj.dx
+            self.rect.y += self.ground_obj.dy
 
         # Conveyor belt pushes you while grounded
         if self.on_ground and isinstance(self.ground_obj, ConveyorPlatform):
@@ -136,58 +169,85 @@ class Player:
             self.kill("Fell into the void.")
 
     def _move_and_collide(self, dt: float, level):
-        # --- X axis ---
-        self.rect.x += int(self.vel.x * dt)
-        for p in level.platforms:
-            # Some platforms react just by touching (fake platforms)
-            p.on_player_touch(level, self)
-
-            if p.solid and self.rect.colliderect(p.rect):
-                if self.vel.x > 0:
-                    self.rect.right = p.rect.left
-                elif self.vel.x < 0:
-                    self.rect.left = p.rect.right
-                self.vel.x = 0
-
-        # ---Y axis--- 
-        self.rect.y += int(self.vel.y * dt)
+        # Each axis is swept, so a fast move can't skip over a thin platform. Sweeping
+        # x then y can still cut a corner on a long diagonal move, so moves longer than
+        # the level's thinnest platform (level.thinnest) are split into substeps.
+        dx = int(self.vel.x * dt)
+        dy = int(self.vel.y * dt)
         self.on_ground = False
         self.ground_obj = None
 
-        for p in level.platforms:
-            p.on_player_touch(level, self)
-            if not p.solid:
-                continue
-
-            if self.rect.colliderect(p.rect):
-                if self.vel.y > 0:
-                    # landing
-                    self.rect.bottom = p.rect.top
-                    self.vel.y = 0
-                    self.on_ground = True
-                    self.ground_obj = p
-                    p.on_player_land(level, self)
-                elif self.vel.y < 0:
-                    # head bump
-                    self.rect.top = p.rect.bottom
-                    self.vel.y = 0
-
-    def draw(self, surf: pg.Surface, cam: Camera):
+        n = max(1, -(-max(abs(dx), abs(dy)) // level.thinnest))
+        for k in range(n):
+            # whole pixels, adding up to dx/dy; nothing more once that axis hit something
+            sx = dx * (k + 1) // n - dx * k // n if self.vel.x else 0
+            sy = dy * (k + 1) // n - dy * k // n if self.vel.y else 0
+            self._sweep_x(sx, level)
+            self._sweep_y(sy, level)
+
+    def _hits(self, old: pg.Rect, level) -> list:
+        # Solid platforms the move from old to self.rect ran into: the ones overlapping
+        # where it ended up, plus any it passed through on the way
+        r = self.rect
+        swept = r.union(old)
+        hits = []
+        # Only platforms near the swept rect can be hit (spatial hash broadphase)
+        for p in level.platform_index.query(swept):
+            if p.solid:
+                pr = p.rect
+                if r.colliderect(pr) or (swept.colliderect(pr) and not old.colliderect(pr)):
+                    hits.append(p)
+                    # Some platforms react just by touching (fake platforms)
+                    if p.contact_events:
+                        level.contacts.touch(p)
+        return hits
+
+    def _sweep_x(self, dx: int, level):
+        old = self.rect.copy()
+        self.rect.x += dx
+        hits = self._hits(old, level)
+        if not hits:
+            return
+        # stop at the nearest face
+        if self.vel.x > 0:
+            self.rect.right = min(p.rect.left for p in hits)
+        elif self.vel.x < 0:
+            self.rect.left = max(p.rect.right for p in hits)
+        self.vel.x = 0
+
+    def _sweep_y(self, dy: int, level):
+        old = self.rect.copy()
+        self.rect.y += dy
+        hits = self._hits(old, level)
+        if not hits:
+            return
+        if self.vel.y > 0:
+            # landing (on the first platform, in index order, at the highest top)
+            top = min(p.rect.top for p in hits)
+            ground = next(p for p in hits if p.rect.top == top)
+            self.rect.bottom = top
+            self.vel.y = 0
+            self.on_ground = True
+            self.ground_obj = ground
+            ground.on_player_land(level, self)
+        elif self.vel.y < 0:
+            # head bump
+            self.rect.top = max(p.rect.bottom for p in hits)
+            self.vel.y = 0
+
+    #
+    # Drawing
+    #
+    # The walk cycle is quantized into ANIM_FRAMES poses per facing, pre-rendered
+    # once into a sprite atlas, so drawing the player is a single blit.
+
+    ANIM_FRAMES = 12
+    _ATLAS_PAD = 8  # room around the 30x60 rect for swinging limbs
+    _atlas: pg.Surface | None = None
+
+    @staticmethod
+    def _draw_figure(surf: pg.Surface, r: pg.Rect, facing: int, swing: float, bob: float):
         # Stick figure with small arm/leg animation
-        r = cam.apply(self.rect)
-
-        facing = 1 if self.vel.x >= 0 else -1
-        speed = abs(self.vel.x)
-        moving = speed > 30
-        t = pg.time.get_ticks() / 1000.0
-
-        freq = 8 + (min(speed, 360) / 360) * 10
-        swing = 0.0
-        bob = 0.0
-        if moving and self.on_ground:
-            swing = 10 * math.sin(t * freq)
-            bob = 2 * math.sin(t * freq)
-
         cx = r.centerx
         head_r = 9
         head_y = int(r.y + head_r + 4 + bob)
@@ -212,19 +272,84 @@ class Player:
         pg.draw.line(surf, WHITE, (cx, leg_base), (cx + facing * (10 + int(swing)), r.bottom), 3)
         pg.draw.line(surf, WHITE, (cx, leg_base), (cx - facing * (8 + int(swing * 0.6)), r.bottom), 2)
 
+    @classmethod
+    def build_atlas(cls) -> pg.Surface:
+        # Row 0 faces right, row 1 faces left. Column 0 is standing still,
+        # columns 1..ANIM_FRAMES are evenly spaced phases of the walk cycle.
+        if cls._atlas is not None:
+            return cls._atlas
+
+        pad = cls._ATLAS_PAD
+        fw, fh = 30 + 2 * pad, 60 + 2 * pad
+        n = cls.ANIM_FRAMES
+        atlas = pg.Surface((fw * (n + 1), fh * 2), pg.SRCALPHA)
+        if pg.display.get_surface() is not None:
+            atlas = atlas.convert_alpha()
+        atlas.fill((0, 0, 0, 0))
+
+        for row, facing in enumerate((1, -1)):
+            for col in range(n + 1):
+                swing = bob = 0.0
+                if col > 0:
+                    s = math.sin(2 * math.pi * (col - 1) / n)
+                    swing = 10 * s
+                    bob = 2 * s
+                r = pg.Rect(col * fw + pad, row * fh + pad, 30, 60)
+                cls._draw_figure(atlas, r, facing, swing, bob)
+
+        cls._atlas = atlas
+        return atlas
+
+    def frame_area(self) -> tuple[int, int, int, int]:
+        # Atlas area of the current animation frame; it is drawn at rect.topleft - _ATLAS_PAD
+        facing = 1 if self.vel.x >= 0 else -1
+        speed = abs(self.vel.x)
+        moving = speed > 30
+
+        col = 0
+        if moving and self.on_ground:
+            t = pg.time.get_ticks() / 1000.0
+            freq = 8 + (min(speed, 360) / 360) * 10
+            phase = (t * freq / (2 * math.pi)) % 1.0
+            col = 1 + int(phase * self.ANIM_FRAMES + 0.5) % self.ANIM_FRAMES
+
+        pad = self._ATLAS_PAD
+        fw, fh = 30 + 2 * pad, 60 + 2 * pad
+        row = 0 if facing == 1 else 1
+        return (col * fw, row * fh, fw, fh)
+
+    def draw(self, surf: pg.Surface, cam: Camera):
+        r = cam.apply(self.rect)
+        pad = self._ATLAS_PAD
+        return surf.blit(self.build_atlas(), (r.x - pad, r.y - pad), self.frame_area())
 
 # 
 # Platforms
 class Platform:
     # Base platform. Most platform types just change update/on_land logic.
+    # Slotted, like every entity kind: no per-instance __dict__, and plain
+    # attribute lookups in the update, collision and draw loops. Unlike spikes,
+    # platforms aren't array-backed: each keeps its own pg.Rect, which the
+    # collision boxes, broadphase and draw interpolation share.
+    __slots__ = ("rect", "color", "solid", "dead")
+
+    dynamic = False  # True if the rect can move (the level re-indexes it every frame)
+    stateful = False  # True if snapshot()/restore() carry anything (see Level.snapshot)
+    baked = True  # False if it moves, vanishes or animates (drawn every frame, not pre-rendered)
+    contact_events = 0  # contacts.CONTACT_* bits this platform wants (see contacts.py)
+    dx = dy = 0  # how far it moved in the last step (dynamic platforms carry the player by it)
+
     def __init__(self, rect: pg.Rect, color=DARK, solid=True):
         self.rect = rect
         self.color = color
         self.solid = solid
         self.dead = False  # removed from the list when True
 
-    def on_player_touch(self, level, player: Player):
-        pass
+    def snapshot(self):
+        return (self.rect.x, self.rect.y, self.solid, self.dead)
+
+    def restore(self, state):
+        self.rect.x, self.rect.y, self.solid, self.dead = state
 
     def on_player_land(self, level, player: Player):
         pass
@@ -232,123 +357,192 @@ class Platform:
     def update(self, dt: float, level):
         pass
 
+    def seek(self, t: float, level):
+        # Put the platform where it is at level time t (level.clock). Called when it
+        # is loaded again after sleeping far from the player, and after a restore.
+        pass
+
+    def sprite_key(self):
+        # Everything draw() output depends on besides position (None: draws nothing).
+        # Texture rendering caches one sprite per key.
+        return (type(self), self.rect.size, self.color)
+
     def draw(self, surf: pg.Surface, cam: Camera):
+        # Returns the screen rect it drew into (None if nothing), for dirty-rect rendering
         r = cam.apply(self.rect)
         pg.draw.rect(surf, self.color, r, border_radius=10)
         pg.draw.rect(surf, (90, 92, 110), r, width=2, border_radius=10)
+        return r
 
 
 class FakePlatform(Platform):
     # Turns off after a short delay 
+    __slots__ = ("delay", "triggered_at")
+
+    stateful = True
+    baked = False
+    contact_events = CONTACT_BEGIN
+
     def __init__(self, rect: pg.Rect, delay=0.1):
         super().__init__(rect, PURPLE, solid=True)
         self.delay = delay
-        self.triggered = False
+        self.triggered_at = None  # level clock when first touched
+
+    def snapshot(self):
+        return (super().snapshot(), self.triggered_at)
+
+    def restore(self, state):
+        base, self.triggered_at = state
+        super().restore(base)
+
+    def _trigger(self, level):
+        self.triggered_at = level.clock
+        level.flash_msg("Purple = liar.", 0.8)
 
     def on_player_land(self, level, player: Player):
-        if not self.triggered:
-            self.triggered = True
-            level.flash_msg("Purple = liar.", 0.8)
+        if self.triggered_at is None:
+            self._trigger(level)
 
-    def on_player_touch(self, level, player: Player):
+    def on_contact_begin(self, level, player: Player):
         # Some cases touch triggers it even if you don't fully land
-        if (not self.triggered) and self.rect.colliderect(player.rect):
-            self.triggered = True
-            level.flash_msg("Purple = liar.", 0.8)
+        if self.triggered_at is None:
+            self._trigger(level)
 
     def update(self, dt: float, level):
-        if self.triggered:
-            self.delay -= dt
-            if self.delay <= 0:
-                self.dead = True
-                self.solid = False
+        self.seek(level.clock, level)
+
+    def seek(self, t: float, level):
+        if self.triggered_at is not None and due(t, self.triggered_at, self.delay):
+            self.dead = True
+            self.solid = False
 
 
 class InvisiblePlatform(Platform):
     # Solid platform that does not draw
+    __slots__ = ()
+
     def __init__(self, rect: pg.Rect):
         super().__init__(rect, color=(60, 60, 80), solid=True)
 
+    def sprite_key(self):
+        return None
+
     def draw(self, surf: pg.Surface, cam: Camera):
-        return
+        return None
 
 
 class FallingPlatform(Platform):
     # Falls once the player stands on it
+    __slots__ = ("top", "delay", "armed_at")
+
+    dynamic = True
+    stateful = True
+    baked = False
+
+    GRAVITY = 2600.0
+
     def __init__(self, rect: pg.Rect, fall_delay=0.18):
         super().__init__(rect, CYAN, solid=True)
-        self.armed = False
+        self.top = rect.y
         self.delay = fall_delay
-        self.vy = 0.0
+        self.armed_at = None  # level clock when first stood on
+
+    def snapshot(self):
+        return (super().snapshot(), self.armed_at)
+
+    def restore(self, state):
+        base, self.armed_at = state
+        super().restore(base)
 
     def on_player_land(self, level, player: Player):
-        self.armed = True
+        if self.armed_at is None:
+            self.armed_at = level.clock
 
     def update(self, dt: float, level):
-        if self.armed:
-            self.delay -= dt
-            if self.delay <= 0:
-                self.vy += 2600 * dt
-                self.rect.y += int(self.vy * dt)
-                if self.rect.top > level.world_h + 450:
-                    self.dead = True
+        self.seek(level.clock, level)
+
+    def seek(self, t: float, level):
+        if self.armed_at is None:
+            return
+        if not due(t, self.armed_at, self.delay):
+            self.rect.y = self.top
+            return
+        self.rect.y = self.top + int(fall_distance(self.GRAVITY, t - self.armed_at - self.delay))
+        if self.rect.top > level.world_h + 450:
+            self.dead = True
 
 
 class MovingPlatform(Platform):
     # Moves back and forth between point A and point B
+    __slots__ = ("start", "a", "b", "speed", "dx", "dy")
+
+    dynamic = True
+    baked = False
+
     def __init__(self, rect: pg.Rect, a, b, speed=160.0):
         super().__init__(rect, color=(255, 180, 80), solid=True)
-        self.a = Vec2(a)
-        self.b = Vec2(b)
+        self.start = rect.topleft  # first heads for b, then ping-pongs between a and b
+        self.a = tuple(a)
+        self.b = tuple(b)
         self.speed = speed
-        self.dir = 1
-        self.delta = Vec2(0, 0)  # how much it moved this frame
+        self.dx = self.dy = 0
+
+    def position(self, t: float) -> tuple[int, int]:
+        # Exactly speed px/s along the path, both ways. (Stepping it frame by frame
+        # truncated each step to whole pixels, so movers used to run up to ~25%
+        # slower in one direction than the other.)
+        x, y = ping_pong(*self.start, *self.a, *self.b, self.speed * t)
+        return int(x), int(y)
 
     def update(self, dt: float, level):
-        old = Vec2(self.rect.topleft)
+        x, y = self.position(level.clock)
+        r = self.rect
+        self.dx, self.dy = x - r.x, y - r.y
+        r.topleft = (x, y)
 
-        target = self.b if self.dir == 1 else self.a
-        pos = Vec2(self.rect.topleft)
-        d = target - pos
-        dist = d.length()
+    def seek(self, t: float, level):
+        self.rect.topleft = self.position(t)
+        self.dx = self.dy = 0
 
-        if dist < 1:
-            self.dir *= -1
-            self.delta.update(0, 0)
-            return
 
-        d.normalize_ip()
-        step = min(dist, self.speed * dt)
-        pos += d * step
-        self.rect.topleft = (int(pos.x), int(pos.y))
+class ConveyorPlatform(Platform):
+    # Pushes the player sideways while standing on it
+    __slots__ = ("speed", "boost", "arrow_dir", "scroll")
 
-        new = Vec2(self.rect.topleft)
-        self.delta = new - old
+    baked = False  # arrows scroll
 
+    ARROW_SCROLL = 40.0  # px/s the arrows crawl (visual only)
 
-class ConveyorPlatform(Platform):
-    # Pushes the player sideways while standing on it
     def __init__(self, rect: pg.Rect, speed: float, boost: float = 1.0):
         super().__init__(rect, color=(120, 220, 255), solid=True)
         self.speed = speed
         self.boost = boost
+        # The arrows point against the push (they "help" you)
+        self.arrow_dir = -1 if speed > 0 else 1
+        self.scroll = 0.0
+
+    def update(self, dt: float, level):
+        self.seek(level.clock, level)
+
+    def seek(self, t: float, level):
+        self.scroll = self.ARROW_SCROLL * t
+
+    def sprite_key(self):
+        return super().sprite_key() + (self.arrow_dir, int(self.scroll) % ARROW_PERIOD)
 
     def draw(self, surf: pg.Surface, cam: Camera):
-        # Same platform look but with arrows
+        # Same platform look but with arrows (blitted from a cached strip)
         r = cam.apply(self.rect)
         pg.draw.rect(surf, self.color, r, border_radius=10)
         pg.draw.rect(surf, WHITE, r, 2, border_radius=10)
-        for x in range(r.left + 12, r.right - 12, 28):
-            pg.draw.polygon(
-                surf, (30, 30, 40),
-                [(x, r.centery),
-                 (x + (10 if self.speed > 0 else -10), r.centery - 6),
-                 (x + (10 if self.speed > 0 else -10), r.centery + 6)]
-            )
+        draw_conveyor_arrows(surf, r, self.arrow_dir, self.scroll)
+        return r
 
 
 class BouncePlatform(Platform):
     # Sets player horizontal velocity on landing (launch pad)
+    __slots__ = ("strength",)
+
     def __init__(self, rect: pg.Rect, strength: float = 900.0):
         super().__init__(rect, color=(255, 180, 80), solid=True)
         self.strength = strength
@@ -359,93 +553,131 @@ class BouncePlatform(Platform):
         level.flash_msg("NOPE.", 0.7)
 
 
+class StaticCollider:
+    # Collision-only box standing in for several plain solid platforms that
+    # together form one rectangle (see level_schema.merge_boxes). Never drawn.
+    __slots__ = ("rect",)
+    solid = True
+    dead = False
+    dynamic = False
+    dx = dy = 0
+    stateful = False
+    baked = True
+    contact_events = 0
+
+    def __init__(self, rect: pg.Rect):
+        self.rect = rect
+
+    def on_player_land(self, level, player: Player):
+        pass
+
+
 #
 # Spikes / Traps
 
 class Spike:
-    def __init__(self, rect: pg.Rect, active=True):
-        self.rect = rect
-        self.active = active
+    # Handle into a HazardField (hazards.py): the field owns position, size and
+    # flags, and moves/checks all spikes in one batched pass per step.
+    __slots__ = ("field", "i")
+
+    kind = hz.STATIC
+
+    def __init__(self, field: hz.HazardField, rect: pg.Rect, active=True, vel=(0.0, 0.0)):
+        self.field = field
+        self.i = field.add(self.kind, rect, vel[0], vel[1], active, handle=self)
 
-    def check(self, player: Player):
-        if self.active and self.rect.colliderect(player.rect):
-            player.kill("Spikes.")
+    @property
+    def rect(self) -> pg.Rect:
+        # A fresh Rect (read-only view); move spikes through the field or trigger()
+        return self.field.rect(self.i)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.field.active[self.i])
+
+    @active.setter
+    def active(self, value: bool):
+        self.field.set_active(self.i, value)
+
+    @property
+    def triggered(self) -> bool:
+        return bool(self.field.triggered[self.i])
 
     def draw(self, surf: pg.Surface, cam: Camera):
-        # Triangle spikes
+        # Triangle spikes (pre-rendered per size)
         if not self.active:
-            return
-        r = cam.apply(self.rect)
-        count = max(1, r.width // 16)
-        w = r.width / count
-        for i in range(count):
-            x0 = r.left + i * w
-            x1 = x0 + w
-            mid = (x0 + x1) / 2
-            pg.draw.polygon(surf, RED, [(x0, r.bottom), (x1, r.bottom), (mid, r.top)])
-        pg.draw.rect(surf, (255, 220, 220), r, 1)
+            return None
+        f, i = self.field, self.i
+        return surf.blit(
+            spike_sprite(int(f.w[i]), int(f.h[i])),
+            (int(f.x[i]) - int(cam.offset.x), int(f.y[i]) - int(cam.offset.y)),
+        )
 
 
 class SlidingSpike(Spike):
     # Moves when triggered (usually by a trigger zone)
-    def __init__(self, rect: pg.Rect, vel):
-        super().__init__(rect, active=True)
-        self.vel = Vec2(vel)
-        self.triggered = False
+    __slots__ = ()
 
-    def trigger(self, level):
-        self.triggered = True
-        level.flash_msg("RUN.", 0.7)
+    kind = hz.SLIDING
 
-    def update(self, dt: float, level):
-        if self.triggered:
-            self.rect.x += int(self.vel.x * dt)
-            self.rect.y += int(self.vel.y * dt)
+    def __init__(self, field: hz.HazardField, rect: pg.Rect, vel):
+        super().__init__(field, rect, active=True, vel=vel)
+
+    def trigger(self, level, target_x: int | None = None):
+        # Slides along its own line (target_x is ignored)
+        self.field.trigger(self.i, level.clock)
 
 
 class FallingSpike(Spike):
     # Drops down once triggered
-    def __init__(self, rect: pg.Rect, drop_speed=1200.0):
-        super().__init__(rect, active=True)
-        self.drop_speed = drop_speed
-        self.triggered = False
-        self.start_y = rect.y  # used so it can reset to its start height
+    __slots__ = ()
+
+    kind = hz.FALLING
+
+    def __init__(self, field: hz.HazardField, rect: pg.Rect, drop_speed=1200.0):
+        super().__init__(field, rect, active=True, vel=(0.0, drop_speed))
 
     def trigger(self, level, target_x: int | None = None):
-        # Reset to start Y each time, then activate
-        self.rect.y = self.start_y
-        self.triggered = True
+        # Reset to start Y each time
+        f, i = self.field, self.i
+        f.y[i] = f.start_y[i]
 
         # Optional: align above the player
         if target_x is not None:
-            self.rect.centerx = target_x
-
-        # Clamp inside the world
-        self.rect.x = max(0, min(self.rect.x, level.world_w - self.rect.w))
+            f.x[i] = target_x - f.w[i] // 2
 
-    def update(self, dt: float, level):
-        if self.triggered:
-            self.rect.y += int(self.drop_speed * dt)
+        # Clamp inside the world, then drop from there
+        f.x[i] = max(0, min(int(f.x[i]), level.world_w - int(f.w[i])))
+        f.trigger(i, level.clock)
 
 
 class RisingSpike(Spike):
     # Shoots up once triggered
-    def __init__(self, rect: pg.Rect, rise_speed=1400.0):
-        super().__init__(rect, active=True)
-        self.rise_speed = rise_speed
-        self.triggered = False
+    __slots__ = ()
 
-    def trigger(self, level):
-        self.triggered = True
+    kind = hz.RISING
 
-    def update(self, dt: float, level):
-        if self.triggered:
-            self.rect.y -= int(self.rise_speed * dt)
+    def __init__(self, field: hz.HazardField, rect: pg.Rect, rise_speed=1400.0):
+        super().__init__(field, rect, active=True, vel=(0.0, -rise_speed))
+
+    def trigger(self, level, target_x: int | None = None):
+        f, i = self.field, self.i
+
+        # Optional: come up under the player
+        if target_x is not None:
+            f.x[i] = target_x - f.w[i] // 2
+            f.x[i] = max(0, min(int(f.x[i]), level.world_w - int(f.w[i])))
+        f.trigger(i, level.clock)
 
 #
 # Goal + UI helpers
 
 class Goal:
+    __slots__ = (
+        "rect", "run_away", "teleport_once", "teleport_to", "_did_tp",
+        "patrol", "patrol_a", "patrol_b", "patrol_speed", "_patrol_from",
+    )
+
     def __init__(self, rect: pg.Rect):
         self.rect = rect
         self.run_away = False
@@ -458,7 +690,18 @@ class Goal:
         self.patrol_a = None
         self.patrol_b = None
         self.patrol_speed = 0.0
-        self._patrol_dir = 1
+        self._patrol_from = (rect.x, rect.y, 0.0)  # where and when (level clock) the patrol path starts
+
+    def snapshot(self):
+        return (self.rect.x, self.rect.y, self._did_tp, self._patrol_from)
+
+    def restore(self, state):
+        self.rect.x, self.rect.y, self._did_tp, self._patrol_from = state
+
+    def move_to(self, pos, t: float):
+        # Jump somewhere at level time t; a patrol carries on from there
+        self.rect.topleft = pos
+        self._patrol_from = (self.rect.x, self.rect.y, t)
 
     def reached(self, player: Player) -> bool:
         return self.rect.colliderect(player.rect)
@@ -466,38 +709,39 @@ class Goal:
     def on_touch(self, level):
         # Some levels use "teleport_once" (door moves once)
         if self.teleport_once and (not self._did_tp) and self.teleport_to is not None:
-            self.rect.topleft = self.teleport_to
+            self.move_to(self.teleport_to, level.clock)
             self._did_tp = True
             level.flash_msg("Where did it go?!", 1.0)
 
         # Some levels use "run_away" (door backs off when touched)
         if self.run_away:
-            self.rect.x -= 220
-            self.rect.x = max(0, min(self.rect.x, level.world_w - self.rect.w))
+            x = max(0, min(self.rect.x - 220, level.world_w - self.rect.w))
+            self.move_to((x, self.rect.y), level.clock)
             level.flash_msg("Come back here.", 0.8)
 
     def update(self, dt: float, level):
-        # Optional patrol movement (back and forth)
+        self.seek(level.clock, level)
+
+    def seek(self, t: float, level):
+        # Optional patrol movement (back and forth: first to patrol_b, then between the two)
         if self.patrol and self.patrol_a and self.patrol_b:
-            a = Vec2(self.patrol_a)
-            b = Vec2(self.patrol_b)
-            target = b if self._patrol_dir == 1 else a
-            pos = Vec2(self.rect.topleft)
-            d = target - pos
-            if d.length() < 2:
-                self._patrol_dir *= -1
-            else:
-                d.normalize_ip()
-                pos += d * (self.patrol_speed * dt)
-                self.rect.topleft = (int(pos.x), int(pos.y))
+            x0, y0, t0 = self._patrol_from
+            x, y = ping_pong(x0, y0, *self.patrol_a, *self.patrol_b, self.patrol_speed * (t - t0))
+            self.rect.topleft = (int(x), int(y))
+
+    def sprite_key(self):
+        return (type(self), self.rect.size)
 
     def draw(self, surf: pg.Surface, cam: Camera):
         r = cam.apply(self.rect)
         pg.draw.rect(surf, GREEN, r, border_radius=14)
         pg.draw.rect(surf, WHITE, r, 2, border_radius=14)
+        return r
 
 
 class Sign:
+    __slots__ = ("rect", "text")
+
     def __init__(self, rect: pg.Rect, text: str):
         self.rect = rect
         self.text = text
@@ -508,29 +752,39 @@ class Sign:
         pg.draw.rect(surf, (90, 90, 105), r, 2, border_radius=10)
         y = r.top + 8
         for line in self.text.split("\n"):
-            img = font.render(line, True, (230, 230, 230))
+            img = render_text(font, line, (230, 230, 230))
             surf.blit(img, (r.left + 10, y))
             y += img.get_height() + 2
 
 
 class TriggerZone:
-    # Rectangle zone that runs a function when the player enters it.
-    def __init__(self, rect: pg.Rect, fn, once=True):
+    # Rectangle zone that fires a level event (events.py) when the player enters it
+    # (and every step the player stays inside, unless once). Whether a once-only
+    # event has fired is kept by the level's EventEngine, not here.
+    __slots__ = ("rect", "event", "contact_events")
+
+    def __init__(self, rect: pg.Rect, event: int, once=True):
         self.rect = rect
-        self.fn = fn
-        self.once = once
-        self.used = False
+        self.event = event
+        self.contact_events = CONTACT_BEGIN if once else CONTACT_BEGIN | CONTACT_STAY
 
-    def update(self, level):
-        if self.used and self.once:
-            return
-        if self.rect.colliderect(level.player.rect):
-            self.fn(level)
-            if self.once:
-                self.used = True
+    def on_contact_begin(self, level, player: Player):
+        level.events.fire(level, self.event)
+
+    on_contact_stay = on_contact_begin
 
 
 class ControlZone:
     # Used for inverted controls while inside the zone.
+    __slots__ = ("rect",)
+
+    contact_events = CONTACT_BEGIN | CONTACT_END
+
     def __init__(self, rect: pg.Rect):
         self.rect = rect
+
+    def on_contact_begin(self, level, player: Player):
+        level._invert_zones += 1
+
+    def on_contact_end(self, level, player: Player):
+        level._invert_zones -= 1
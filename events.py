@@ -0,0 +1,155 @@
+# events.py
+# Level events wired to actions by data.
+#
+# A level's events (compiled into EventDef records by level_schema) say what
+# happens when: the level starts, the player enters a zone, makes their Nth (or
+# every) jump, touches the exit, or the level clock passes a time. Each event
+# runs a list of (op, args) actions; op indexes the ACTIONS table below, so
+# building a level creates no closures and trap chains are written in level
+# files, not here.
+#
+# Every action is called as fn(level, count, *args), count being how many times
+# its event has fired (1 the first time). A true return from a goal event's
+# action means this touch doesn't finish the level.
+
+from __future__ import annotations
+
+import pygame as pg
+
+from entities import Spike
+from motion import due
+
+
+# event kinds
+EV_START, EV_ENTER, EV_JUMP, EV_GOAL, EV_TIMER = range(5)
+EVENT_KINDS = {"start": EV_START, "enter": EV_ENTER, "jump": EV_JUMP, "goal": EV_GOAL, "timer": EV_TIMER}
+
+# spike groups actions can trigger (Level attribute per group)
+SPIKE_GROUPS = {"falling": "falling_spikes", "rising": "rising_spikes", "sliding": "sliding_spikes"}
+
+
+#
+# Actions
+
+def _aim(level) -> int:
+    # Where the player will be a moment from now (traps aim there)
+    p = level.player
+    return p.rect.centerx + int(p.vel.x * 0.10)
+
+
+def _invert(level, count, on):
+    level._invert_forced = on
+
+
+def _message(level, count, text, secs):
+    level.flash_msg(text, secs)
+
+
+def _trigger(level, count, group, which, aim):
+    # which: spike indices in the group (None: all of them)
+    spikes = getattr(level, SPIKE_GROUPS[group])
+    x = _aim(level) if aim else None
+    for k in range(len(spikes)) if which is None else which:
+        if k < len(spikes):
+            spikes[k].trigger(level, x)
+
+
+def _cycle(level, count, groups, aim):
+    # One spike per firing, going round the groups' spikes in order
+    spikes = [s for g in groups for s in getattr(level, SPIKE_GROUPS[g])]
+    if spikes:
+        spikes[(count - 1) % len(spikes)].trigger(level, _aim(level) if aim else None)
+
+
+def _arm_spikes(level, count, on):
+    # Ground spikes (not the moving kinds)
+    for s in level.spikes:
+        s.active = on
+
+
+def _move_goal(level, count, pos):
+    level.goal.move_to(pos, level.clock)
+
+
+def _add_spikes(level, count, rects):
+    for r in rects:
+        spike = Spike(level.hazards, pg.Rect(r), active=True)
+        level.spikes.append(spike)
+        level.bake_spike(len(level.spikes) - 1)
+
+
+def _hold_exit(level, count):
+    return True
+
+
+_BY_NAME = {
+    "invert": _invert,
+    "message": _message,
+    "trigger": _trigger,
+    "cycle": _cycle,
+    "arm_spikes": _arm_spikes,
+    "move_goal": _move_goal,
+    "add_spikes": _add_spikes,
+    "hold_exit": _hold_exit,
+}
+ACTIONS = tuple(_BY_NAME.values())  # dispatch table: op -> function
+ACTION_OPS = {name: op for op, name in enumerate(_BY_NAME)}
+
+
+#
+# Runtime
+
+class EventEngine:
+    # Fires a level's events. The only state is how often each has fired, the
+    # jump count and the next timer, so savestates are a small tuple.
+    def __init__(self, events: list):
+        self.events = events
+        self.by_kind: list[list[int]] = [[] for _ in EVENT_KINDS]  # event indices, in level order
+        for i, e in enumerate(events):
+            self.by_kind[e.kind].append(i)
+        self._timers = sorted(self.by_kind[EV_TIMER], key=lambda i: events[i].at)
+
+        self.counts = [0] * len(events)
+        self.jumps = 0
+        self._next_timer = 0
+
+    def fire(self, level, i: int) -> bool:
+        # Run event i's actions (unless it is once-only and has fired). True if one held the exit.
+        e = self.events[i]
+        count = self.counts[i]
+        if count and e.once:
+            return False
+        count += 1
+        self.counts[i] = count
+        held = False
+        for op, args in e.actions:
+            if ACTIONS[op](level, count, *args):
+                held = True
+        return held
+
+    def emit(self, level, kind: int) -> bool:
+        # Fire every event of this kind (jump events only on their jump). True if one held the exit.
+        if kind == EV_JUMP:
+            self.jumps += 1
+        held = False
+        for i in self.by_kind[kind]:
+            at = self.events[i].at
+            if kind == EV_JUMP and at and at != self.jumps:
+                continue
+            if self.fire(level, i):
+                held = True
+        return held
+
+    def update(self, level):
+        # Timers whose time has come, earliest first
+        timers, events = self._timers, self.events
+        while self._next_timer < len(timers) and due(level.clock, 0.0, events[timers[self._next_timer]].at):
+            self.fire(level, timers[self._next_timer])
+            self._next_timer += 1
+
+    def snapshot(self):
+        return (tuple(self.counts), self.jumps, self._next_timer)
+
+    def restore(self, state):
+        counts, self.jumps, self._next_timer = state
+        self.counts = list(counts)
@@ -0,0 +1,197 @@
+# hazards.py
+# Struct-of-arrays storage for every spike in a level.
+#
+# Spike objects (entities.py) are small handles into a HazardField. Movement and
+# the player overlap test run as one batched NumPy pass per sim step, so a level
+# with thousands of spikes costs about the same as one with a handful.
+#
+# A triggered spike moves in a straight line from where it was triggered, and
+# its position is worked out from the level clock (like motion.py), so seek()
+# can put every spike where it is at any time.
+
+from __future__ import annotations
+
+import numpy as np
+import pygame as pg
+
+
+# Spike kinds
+STATIC, SLIDING, FALLING, RISING = range(4)
+
+
+class HazardField:
+    def __init__(self, capacity: int = 16):
+        self.n = 0
+        self._alloc(max(1, capacity))
+        self.handles: list = []  # handles[i] is the Spike object for row i (if any)
+
+        # bumped whenever a static spike is added, removed or (de)activated,
+        # so pre-rendered layers know to redraw them
+        self.version = 0
+
+    def _alloc(self, cap: int):
+        self.x = np.zeros(cap, np.int64)
+        self.y = np.zeros(cap, np.int64)
+        self.w = np.zeros(cap, np.int64)
+        self.h = np.zeros(cap, np.int64)
+        self.vx = np.zeros(cap, np.float64)  # px/s once triggered
+        self.vy = np.zeros(cap, np.float64)
+        self.ox = np.zeros(cap, np.int64)  # where and when (level clock) it was triggered
+        self.oy = np.zeros(cap, np.int64)
+        self.t0 = np.zeros(cap, np.float64)
+        self.start_y = np.zeros(cap, np.int64)  # falling spikes reset here when re-triggered
+        self.active = np.zeros(cap, bool)  # inactive spikes are harmless and not drawn
+        self.triggered = np.zeros(cap, bool)  # triggered spikes move every step
+        self.kind = np.zeros(cap, np.int8)
+
+        # positions before the last step (for interpolated drawing)
+        self.prev_x = np.zeros(cap, np.int64)
+        self.prev_y = np.zeros(cap, np.int64)
+
+    _ARRAYS = (
+        "x", "y", "w", "h", "vx", "vy", "ox", "oy", "t0",
+        "start_y", "active", "triggered", "kind", "prev_x", "prev_y",
+    )
+
+    def __len__(self) -> int:
+        return self.n
+
+    def add(self, kind: int, rect: pg.Rect, vx: float = 0.0, vy: float = 0.0, active: bool = True, handle=None) -> int:
+        i = self.n
+        if i == len(self.x):
+            self._grow()
+        self.x[i], self.y[i], self.w[i], self.h[i] = rect
+        self.prev_x[i] = rect[0]
+        self.prev_y[i] = rect[1]
+        self.start_y[i] = rect[1]
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.ox[i] = rect[0]
+        self.oy[i] = rect[1]
+        self.t0[i] = 0.0
+        self.active[i] = active
+        self.triggered[i] = False
+        self.kind[i] = kind
+        self.handles.append(handle)
+        self.n = i + 1
+        if kind == STATIC:
+            self.version += 1
+        return i
+
+    def trigger(self, i: int, t: float):
+        # Start moving from the current position at level time t
+        self.ox[i] = self.x[i]
+        self.oy[i] = self.y[i]
+        self.t0[i] = t
+        self.triggered[i] = True
+
+    def set_active(self, i: int, value: bool):
+        if self.active[i] == value:
+            return
+        self.active[i] = value
+        if self.kind[i] == STATIC:
+            self.version += 1
+
+    def _grow(self):
+        n = self.n
+        old = {name: getattr(self, name) for name in self._ARRAYS}
+        self._alloc(len(self.x) * 2)
+        for name, arr in old.items():
+            getattr(self, name)[:n] = arr[:n]
+
+    def rect(self, i: int) -> pg.Rect:
+        return pg.Rect(int(self.x[i]), int(self.y[i]), int(self.w[i]), int(self.h[i]))
+
+    #
+    # Per-step work
+
+    def save_prev(self):
+        n = self.n
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def seek(self, t: float):
+        # Put triggered spikes where they are at level time t (rounded to whole pixels)
+        n = self.n
+        moving = self.triggered[:n]
+        if not moving.any():
+            return
+        age = t - self.t0[:n]
+        self.x[:n] = np.where(moving, self.ox[:n] + np.rint(self.vx[:n] * age).astype(np.int64), self.x[:n])
+        self.y[:n] = np.where(moving, self.oy[:n] + np.rint(self.vy[:n] * age).astype(np.int64), self.y[:n])
+
+    def _overlapping(self, rect: pg.Rect):
+        # Mask of active spikes overlapping rect (same test as Rect.colliderect)
+        n = self.n
+        px, py, pw, ph = rect
+        x = self.x[:n]
+        y = self.y[:n]
+        return (
+            self.active[:n]
+            & (x < px + pw) & (x + self.w[:n] > px)
+            & (y < py + ph) & (y + self.h[:n] > py)
+        )
+
+    def hits(self, rect: pg.Rect) -> bool:
+        if self.n == 0:
+            return False
+        return bool(self._overlapping(rect).any())
+
+    def visible(self, view: pg.Rect, moving_only: bool = False) -> list:
+        # Handles of active spikes inside view, in insertion order
+        if self.n == 0:
+            return []
+        mask = self._overlapping(view)
+        if moving_only:
+            mask &= self.kind[:self.n] != STATIC
+        handles = self.handles
+        return [handles[i] for i in mask.nonzero()[0]]
+
+    #
+    # Savestates
+
+    def snapshot(self):
+        n = self.n
+        return (
+            n,
+            self.x[:n].copy(), self.y[:n].copy(),
+            self.ox[:n].copy(), self.oy[:n].copy(), self.t0[:n].copy(),
+            self.active[:n].copy(), self.triggered[:n].copy(),
+        )
+
+    def restore(self, state):
+        # Spikes added after the snapshot are dropped
+        n, x, y, ox, oy, t0, active, triggered = state
+        self.n = n
+        del self.handles[n:]
+        self.x[:n] = x
+        self.y[:n] = y
+        self.ox[:n] = ox
+        self.oy[:n] = oy
+        self.t0[:n] = t0
+        self.active[:n] = active
+        self.triggered[:n] = triggered
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        self.version += 1
+
+    #
+    # Interpolated drawing (see Level.draw)
+
+    def interpolate(self, alpha: float, snap_dist: int):
+        # Move spikes to their blended positions; returns what undo_interpolate() needs
+        n = self.n
+        cur = (self.x[:n].copy(), self.y[:n].copy())
+        cx, cy = cur
+        px = self.prev_x[:n]
+        py = self.prev_y[:n]
+        blend = (np.abs(cx - px) <= snap_dist) & (np.abs(cy - py) <= snap_dist)
+        self.x[:n] = np.where(blend, np.rint(px + (cx - px) * alpha), cx).astype(np.int64)
+        self.y[:n] = np.where(blend, np.rint(py + (cy - py) * alpha), cy).astype(np.int64)
+        return cur
+
+    def undo_interpolate(self, cur):
+        cx, cy = cur
+        n = len(cx)
+        self.x[:n] = cx
+        self.y[:n] = cy
@@ -0,0 +1,102 @@
+# headless.py
+# Steps levels without a window, frame cap or drawing, for automated playtesting.
+#
+#   python headless.py                  # every level, normal + mirrored
+#   python headless.py --ticks 20000 --seed 3 --level 5
+#   python headless.py --hz 15          # coarser steps, faster (collision is swept)
+
+from __future__ import annotations
+
+import os
+import time
+
+# No window: SDL's dummy video driver (must be set before pygame initialises video)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from settings import SIM_DT, SIM_HZ
+from inputs import MaskKeys, RandomInput, MASK_LEFT, MASK_RIGHT
+from level_data import load_levels, LevelVariants
+from main import Level
+
+
+class HeadlessResult:
+    def __init__(self, name: str, outcome: str, ticks: int, seconds: float, dt: float = SIM_DT):
+        self.name = name
+        self.outcome = outcome  # "complete", "dead: <reason>" or "timeout"
+        self.ticks = ticks
+        self.seconds = seconds
+        self.dt = dt
+
+    @property
+    def ticks_per_sec(self) -> float:
+        return self.ticks / self.seconds if self.seconds > 0 else float("inf")
+
+    @property
+    def speedup(self) -> float:
+        # How many times faster than real time (one tick is dt of game time)
+        return self.ticks_per_sec * self.dt
+
+
+def run_level(level: Level, inputs, max_ticks: int, dt: float = SIM_DT) -> HeadlessResult:
+    # inputs: callable tick -> key bitmask (see inputs.py)
+    keys = MaskKeys()
+    outcome = "timeout"
+    tick = 0
+
+    start = time.perf_counter()
+    while tick < max_ticks:
+        keys.mask = inputs(tick)
+        tick += 1
+        if level.step(dt, keys):
+            outcome = "complete"
+            break
+        if level.player.dead:
+            outcome = f"dead: {level.player.death_reason}"
+            break
+    seconds = time.perf_counter() - start
+
+    return HeadlessResult(level.name, outcome, tick, seconds, dt)
+
+
+def run_all(max_ticks: int = 20000, seed: int = 0, only: int | None = None, dt: float = SIM_DT) -> list[HeadlessResult]:
+    base = load_levels()
+    results = []
+    for mirrored in (False, True):
+        levels = LevelVariants(base, "mirror") if mirrored else base
+        for i in range(len(levels)):
+            if only is not None and i != only:
+                continue
+            d = levels[i]
+            # Mirrored levels are won by running left
+            inputs = RandomInput(seed, forward=MASK_LEFT if mirrored else MASK_RIGHT, hz=round(1.0 / dt))
+            results.append(run_level(Level(d, mirrored=mirrored), inputs, max_ticks, dt))
+    return results
+
+
+def main():
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Run levels headless with scripted input.")
+    ap.add_argument("--ticks", type=int, default=20000, help="max sim ticks per level")
+    ap.add_argument("--seed", type=int, default=0, help="seed for the random input script")
+    ap.add_argument("--level", type=int, default=None, help="only run this level (1-based)")
+    ap.add_argument("--hz", type=int, default=SIM_HZ, help="sim steps per second of game time")
+    args = ap.parse_args()
+
+    only = args.level - 1 if args.level is not None else None
+    dt = 1.0 / args.hz
+    results = run_all(args.ticks, args.seed, only, dt)
+
+    total_ticks = 0
+    total_secs = 0.0
+    for r in results:
+        total_ticks += r.ticks
+        total_secs += r.seconds
+        print(f"{r.name:<48} {r.outcome:<28} {r.ticks:>7} ticks  {r.ticks_per_sec:>10.0f} t/s")
+
+    tps = total_ticks / total_secs if total_secs > 0 else float("inf")
+    print(f"\n{total_ticks} ticks in {total_secs:.3f}s = {tps:.0f} ticks/s ({tps * dt:.0f}x real time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# inputs.py
+# Key bitmasks for the keys Player.update reads, so input can be scripted or recorded.
+
+from __future__ import annotations
+
+import pygame as pg
+
+from settings import SIM_HZ
+
+
+# One bit per key, in this order. Replays store these bits, so only append.
+KEY_BITS = (pg.K_a, pg.K_d, pg.K_LEFT, pg.K_RIGHT, pg.K_SPACE, pg.K_w, pg.K_UP)
+_BIT_OF = {k: 1 << i for i, k in enumerate(KEY_BITS)}
+
+MASK_LEFT = _BIT_OF[pg.K_a]
+MASK_RIGHT = _BIT_OF[pg.K_d]
+MASK_JUMP = _BIT_OF[pg.K_SPACE]
+
+
+def encode_keys(keys) -> int:
+    # pg.key.get_pressed() (or anything indexable by key code) -> bitmask
+    mask = 0
+    for i, k in enumerate(KEY_BITS):
+        if keys[k]:
+            mask |= 1 << i
+    return mask
+
+
+class MaskKeys:
+    # Looks like pg.key.get_pressed() to Player.update, but reads a bitmask.
+    __slots__ = ("mask",)
+
+    def __init__(self, mask: int = 0):
+        self.mask = mask
+
+    def __getitem__(self, key) -> bool:
+        return bool(self.mask & _BIT_OF.get(key, 0))
+
+
+#
+# Scripted input sources
+#
+# An input source is any callable: tick index -> key bitmask.
+
+class ScriptedInput:
+    # Plays back (ticks, mask) segments in order, then holds the last mask (or loops).
+    def __init__(self, segments, loop=False):
+        self.masks: list[int] = []
+        for ticks, mask in segments:
+            self.masks.extend([mask] * ticks)
+        self.loop = loop
+
+    def __call__(self, tick: int) -> int:
+        if not self.masks:
+            return 0
+        if tick < len(self.masks):
+            return self.masks[tick]
+        if self.loop:
+            return self.masks[tick % len(self.masks)]
+        return self.masks[-1]
+
+
+class RandomInput:
+    # Seeded "monkey" player: random key combos held for random durations.
+    # Mostly heads towards the exit, so runs actually reach the later traps.
+    def __init__(self, seed: int = 0, forward: int = MASK_RIGHT, hz: int = SIM_HZ):
+        import random
+        self.rng = random.Random(seed)
+        self.forward = forward
+        self.hz = hz  # sim steps per second (hold times are the same in game time)
+        self.back = MASK_LEFT if forward == MASK_RIGHT else MASK_RIGHT
+        self._mask = 0
+        self._until = 0
+
+    def __call__(self, tick: int) -> int:
+        if tick >= self._until:
+            rng = self.rng
+            move = rng.choices((self.forward, self.back, 0), weights=(6, 1, 1))[0]
+            jump = MASK_JUMP if rng.random() < 0.4 else 0
+            self._mask = move | jump
+            self._until = tick + max(1, rng.randint(4, 40) * self.hz // SIM_HZ)
+        return self._mask
@@ -0,0 +1,158 @@
+# level_pack.py
+# Levels live as JSON sources in levels/ and ship as one compiled bundle.
+#
+#   python level_pack.py            # compile levels/*.json -> levels.bin
+#
+# The bundle starts with an index (offset, size and a little metadata per level),
+# so opening it only reads names for the select screen. A level's geometry is read
+# and decoded from disk when the level is actually asked for.
+#
+# Bundle layout (little endian):
+#   header  magic, version, level count, index size in bytes
+#   index   per level: body offset, body size, meta size, meta (UTF-8 JSON)
+#   bodies  per level: zlib-compressed compact JSON of the level source
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import zlib
+
+from level_schema import LevelDef, compile_level
+
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(_HERE, "levels")
+BUNDLE_PATH = os.path.join(_HERE, "levels.bin")
+
+MAGIC = b"TILV"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHII")
+_ENTRY = struct.Struct("<IIH")
+
+
+#
+# Metadata
+
+def level_meta(src: dict) -> dict:
+    # What the select screen needs, without any geometry
+    return {
+        "name": src["name"],
+        "world": src["world"],
+        "platforms": len(src.get("platforms", [])),
+    }
+
+
+#
+# Compiling
+
+def source_files(src_dir: str = SOURCE_DIR) -> list[str]:
+    # Level order is file name order (01_..., 02_..., ...)
+    names = sorted(n for n in os.listdir(src_dir) if n.endswith(".json"))
+    return [os.path.join(src_dir, n) for n in names]
+
+
+def compile_levels(src_dir: str = SOURCE_DIR, out: str = BUNDLE_PATH) -> int:
+    # Returns the number of levels written
+    metas = []
+    bodies = []
+    for path in source_files(src_dir):
+        with open(path, encoding="utf-8") as f:
+            src = json.load(f)
+        try:
+            compile_level(src)  # fail here rather than when the level is picked
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from None
+        metas.append(json.dumps(level_meta(src), separators=(",", ":")).encode("utf-8"))
+        bodies.append(zlib.compress(json.dumps(src, separators=(",", ":")).encode("utf-8"), 9))
+
+    index_size = sum(_ENTRY.size + len(m) for m in metas)
+    offset = _HEADER.size + index_size
+
+    index = bytearray()
+    for meta, body in zip(metas, bodies):
+        index += _ENTRY.pack(offset, len(body), len(meta))
+        index += meta
+        offset += len(body)
+
+    tmp = out + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(bodies), index_size))
+        f.write(index)
+        for body in bodies:
+            f.write(body)
+    os.replace(tmp, out)
+    return len(bodies)
+
+
+def _stale(src_dir: str, out: str) -> bool:
+    if not os.path.exists(out):
+        return True
+    if not os.path.isdir(src_dir):
+        return False  # shipped without sources: use the bundle as is
+    built = os.path.getmtime(out)
+    return any(os.path.getmtime(p) > built for p in source_files(src_dir)) or os.path.getmtime(src_dir) > built
+
+
+#
+# Loading
+
+class LevelPack:
+    # Read-only sequence of compiled levels (level_schema.LevelDef) backed by a bundle file.
+    # Only the index is kept in memory; each access decodes that level from disk.
+    def __init__(self, path: str = BUNDLE_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, count, index_size = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path}: not a level bundle (or an unsupported version)")
+            index = f.read(index_size)
+
+        self._spans: list[tuple[int, int]] = []
+        self.meta: list[dict] = []
+        pos = 0
+        for _ in range(count):
+            offset, size, meta_size = _ENTRY.unpack_from(index, pos)
+            pos += _ENTRY.size
+            self._spans.append((offset, size))
+            self.meta.append(json.loads(index[pos:pos + meta_size]))
+            pos += meta_size
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def name(self, idx: int) -> str:
+        return self.meta[idx]["name"]
+
+    def source(self, idx: int) -> dict:
+        # The level as stored (plain JSON values)
+        offset, size = self._spans[idx]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            body = f.read(size)
+        return json.loads(zlib.decompress(body))
+
+    def __getitem__(self, idx: int) -> LevelDef:
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        return compile_level(self.source(idx))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def load_levels(path: str = BUNDLE_PATH, src_dir: str = SOURCE_DIR) -> LevelPack:
+    # Opens the bundle, (re)compiling it first if the sources are newer
+    if _stale(src_dir, path):
+        compile_levels(src_dir, path)
+    return LevelPack(path)
+
+
+if __name__ == "__main__":
+    n = compile_levels()
+    print(f"{os.path.relpath(BUNDLE_PATH)}: {n} levels")
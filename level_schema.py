@@ -0,0 +1,716 @@
+# level_schema.py
+# Typed level definitions.
+#
+# compile_level() checks a level source (plain JSON values, see level_pack.py)
+# once and turns every entry into a small slotted record. Cloning, mirroring and
+# building a level are then straight loops over records: no kind strings or
+# payload shapes are looked at again.
+
+from __future__ import annotations
+
+import pygame as pg
+
+from spatial import SpatialHash
+from events import EVENT_KINDS, EV_ENTER, EV_JUMP, EV_TIMER, ACTION_OPS, SPIKE_GROUPS
+from entities import (
+    Platform, FakePlatform, InvisiblePlatform, FallingPlatform, MovingPlatform, ConveyorPlatform, BouncePlatform,
+    Spike, SlidingSpike, FallingSpike, RisingSpike,
+    Sign, ControlZone,
+)
+
+
+def _mirror_rect(rect: pg.Rect, world_w: int) -> pg.Rect:
+    return pg.Rect(world_w - rect.x - rect.w, rect.y, rect.w, rect.h)
+
+
+def _rect(v, where: str) -> pg.Rect:
+    try:
+        return pg.Rect(v)
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: expected [x, y, w, h], got {v!r}") from None
+
+
+def _is_number(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _number(v, where: str) -> float:
+    if not _is_number(v):
+        raise ValueError(f"{where}: expected a number, got {v!r}")
+    return v
+
+
+def _list(v, where: str) -> list:
+    if not isinstance(v, (list, tuple)):
+        raise ValueError(f"{where}: expected a list, got {v!r}")
+    return v
+
+
+def _text(v, where: str) -> str:
+    if not isinstance(v, str):
+        raise ValueError(f"{where}: expected a string, got {v!r}")
+    return v
+
+
+def _point(v, where: str) -> tuple[int, int]:
+    if not isinstance(v, (list, tuple)) or len(v) != 2 or not all(map(_is_number, v)):
+        raise ValueError(f"{where}: expected [x, y], got {v!r}")
+    return (v[0], v[1])
+
+
+#
+# Platforms
+#
+# Each record knows its JSON payload shape (from_json), how to copy and mirror
+# itself, and which entity it builds.
+
+class _RectPlatformDef:
+    # Platforms described by just a rect
+    __slots__ = ("rect",)
+    entity = Platform
+    static_solid = False  # plain, never-moving solid: collides through merged boxes
+
+    def __init__(self, rect: pg.Rect):
+        self.rect = rect
+
+    @classmethod
+    def from_json(cls, payload, where: str):
+        return cls(_rect(payload, where))
+
+    def clone(self):
+        return type(self)(self.rect.copy())
+
+    def mirrored(self, world_w: int):
+        return type(self)(_mirror_rect(self.rect, world_w))
+
+    def bounds(self) -> pg.Rect:
+        # Everywhere the platform can be while it is solid (world streaming buckets it by this)
+        return self.rect
+
+    def build(self):
+        return self.entity(self.rect.copy())
+
+
+class SolidDef(_RectPlatformDef):
+    __slots__ = ()
+    entity = Platform
+    static_solid = True
+
+
+class FakeDef(_RectPlatformDef):
+    __slots__ = ()
+    entity = FakePlatform
+
+
+class FallingDef(_RectPlatformDef):
+    __slots__ = ()
+    entity = FallingPlatform
+
+
+class InvisibleDef(_RectPlatformDef):
+    __slots__ = ()
+    entity = InvisiblePlatform
+    static_solid = True
+
+
+class MovingDef:
+    __slots__ = ("rect", "a", "b", "speed")
+    static_solid = False
+
+    def __init__(self, rect: pg.Rect, a: tuple, b: tuple, speed: float):
+        self.rect = rect
+        self.a = a
+        self.b = b
+        self.speed = speed
+
+    @classmethod
+    def from_json(cls, payload, where: str):
+        if not isinstance(payload, (list, tuple)) or len(payload) != 4:
+            raise ValueError(f"{where}: expected [rect, a, b, speed]")
+        rect, a, b, speed = payload
+        return cls(_rect(rect, where), _point(a, where), _point(b, where), _number(speed, f"{where}: speed"))
+
+    def clone(self):
+        return MovingDef(self.rect.copy(), self.a, self.b, self.speed)
+
+    def mirrored(self, world_w: int):
+        return MovingDef(
+            _mirror_rect(self.rect, world_w),
+            (world_w - self.a[0], self.a[1]),
+            (world_w - self.b[0], self.b[1]),
+            self.speed,
+        )
+
+    def bounds(self) -> pg.Rect:
+        r = self.rect
+        return r.union(pg.Rect(self.a, r.size)).union(pg.Rect(self.b, r.size))
+
+    def build(self):
+        return MovingPlatform(self.rect.copy(), self.a, self.b, self.speed)
+
+
+class ConveyorDef:
+    __slots__ = ("rect", "speed", "boost")
+    static_solid = False
+
+    def __init__(self, rect: pg.Rect, speed: float, boost: float = 1.0):
+        self.rect = rect
+        self.speed = speed
+        self.boost = boost
+
+    @classmethod
+    def from_json(cls, payload, where: str):
+        if not isinstance(payload, (list, tuple)) or len(payload) not in (2, 3):
+            raise ValueError(f"{where}: expected [rect, speed] or [rect, speed, boost]")
+        return cls(_rect(payload[0], where),
+                   *(_number(v, f"{where}: {k}") for k, v in zip(("speed", "boost"), payload[1:])))
+
+    def clone(self):
+        return ConveyorDef(self.rect.copy(), self.speed, self.boost)
+
+    def mirrored(self, world_w: int):
+        return ConveyorDef(_mirror_rect(self.rect, world_w), -self.speed, self.boost)
+
+    def bounds(self) -> pg.Rect:
+        return self.rect
+
+    def build(self):
+        return ConveyorPlatform(self.rect.copy(), self.speed, boost=self.boost)
+
+
+class BounceDef:
+    __slots__ = ("rect", "strength")
+    static_solid = False
+
+    def __init__(self, rect: pg.Rect, strength: float):
+        self.rect = rect
+        self.strength = strength
+
+    @classmethod
+    def from_json(cls, payload, where: str):
+        if not isinstance(payload, (list, tuple)) or len(payload) != 2:
+            raise ValueError(f"{where}: expected [rect, strength]")
+        return cls(_rect(payload[0], where), _number(payload[1], f"{where}: strength"))
+
+    def clone(self):
+        return BounceDef(self.rect.copy(), self.strength)
+
+    def mirrored(self, world_w: int):
+        return BounceDef(_mirror_rect(self.rect, world_w), self.strength)
+
+    def bounds(self) -> pg.Rect:
+        return self.rect
+
+    def build(self):
+        return BouncePlatform(self.rect.copy(), strength=self.strength)
+
+
+#
+# Static collision boxes
+#
+# Plain solid platforms never move or react to the player, so for collision only
+# their area matters. Ones that together form a single rectangle (side by side
+# with the same height, stacked with the same width, or one inside the other)
+# collide as one box. Drawing still uses the individual platforms.
+
+class _Box:
+    __slots__ = ("rect", "first")
+
+    def __init__(self, rect: pg.Rect, first: int):
+        self.rect = rect
+        self.first = first
+
+
+def _union_is_box(a: pg.Rect, b: pg.Rect) -> bool:
+    if a.contains(b) or b.contains(a):
+        return True
+    if a.y == b.y and a.h == b.h:
+        return a.x <= b.right and b.x <= a.right
+    if a.x == b.x and a.w == b.w:
+        return a.y <= b.bottom and b.y <= a.bottom
+    return False
+
+
+def merge_boxes(rects: list) -> list[tuple[pg.Rect, int]]:
+    # Greedily merge rects whose union is exactly a rectangle, until none are left.
+    # Returns (box, index of the first rect in it), ordered by that index; the boxes
+    # cover exactly the same area as the rects.
+    index = SpatialHash()
+    boxes = [_Box(pg.Rect(r), i) for i, r in enumerate(rects)]
+    for b in boxes:
+        index.insert(b, order=b.first)
+
+    merged = True
+    while merged:
+        merged = False
+        for a in boxes:
+            if a not in index:
+                continue
+            grown = True
+            while grown:
+                grown = False
+                # inflated so boxes that only touch are found too
+                for b in index.query(a.rect.inflate(2, 2)):
+                    if b is a or not _union_is_box(a.rect, b.rect):
+                        continue
+                    index.remove(b)
+                    a.rect = a.rect.union(b.rect)
+                    a.first = min(a.first, b.first)
+                    index.update(a)
+                    grown = merged = True
+                    break
+
+    left = sorted((b for b in boxes if b in index), key=lambda b: b.first)
+    return [(b.rect, b.first) for b in left]
+
+
+def static_colliders(platforms: list) -> list[tuple[pg.Rect, int]]:
+    # Merged boxes for the static solid platforms, tagged with the list position
+    # of their first platform (the collision order the level uses)
+    positions = [i for i, p in enumerate(platforms) if p.static_solid]
+    return [(box, positions[k]) for box, k in merge_boxes([platforms[i].rect for i in positions])]
+
+
+PLATFORM_KINDS = {
+    "solid": SolidDef,
+    "fake": FakeDef,
+    "falling": FallingDef,
+    "invisible": InvisibleDef,
+    "moving": MovingDef,
+    "conveyor": ConveyorDef,
+    "bounce": BounceDef,
+}
+
+
+#
+# Hazards, signs and zones
+
+class SpikeDef:
+    __slots__ = ("rect",)
+
+    def __init__(self, rect: pg.Rect):
+        self.rect = rect
+
+    def clone(self):
+        return SpikeDef(self.rect.copy())
+
+    def mirrored(self, world_w: int):
+        return SpikeDef(_mirror_rect(self.rect, world_w))
+
+    def build(self, field):
+        return Spike(field, self.rect, active=True)
+
+
+class SlidingSpikeDef:
+    __slots__ = ("rect", "vel")
+
+    def __init__(self, rect: pg.Rect, vel: tuple):
+        self.rect = rect
+        self.vel = vel
+
+    def clone(self):
+        return SlidingSpikeDef(self.rect.copy(), self.vel)
+
+    def mirrored(self, world_w: int):
+        return SlidingSpikeDef(_mirror_rect(self.rect, world_w), (-self.vel[0], self.vel[1]))
+
+    def build(self, field):
+        return SlidingSpike(field, self.rect, self.vel)
+
+
+class FallingSpikeDef:
+    __slots__ = ("rect", "speed")
+
+    def __init__(self, rect: pg.Rect, speed: float):
+        self.rect = rect
+        self.speed = speed
+
+    def clone(self):
+        return type(self)(self.rect.copy(), self.speed)
+
+    def mirrored(self, world_w: int):
+        return type(self)(_mirror_rect(self.rect, world_w), self.speed)
+
+    def build(self, field):
+        return FallingSpike(field, self.rect, drop_speed=self.speed)
+
+
+class RisingSpikeDef(FallingSpikeDef):
+    __slots__ = ()
+
+    def build(self, field):
+        return RisingSpike(field, self.rect, rise_speed=self.speed)
+
+
+class SignDef:
+    __slots__ = ("rect", "text")
+
+    def __init__(self, rect: pg.Rect, text: str):
+        self.rect = rect
+        self.text = text
+
+    def clone(self):
+        return SignDef(self.rect.copy(), self.text)
+
+    def mirrored(self, world_w: int):
+        return SignDef(_mirror_rect(self.rect, world_w), self.text)
+
+    def build(self):
+        return Sign(self.rect, self.text)
+
+
+class ZoneDef:
+    # Control zone (inverts controls while the player is inside)
+    __slots__ = ("rect",)
+
+    def __init__(self, rect: pg.Rect):
+        self.rect = rect
+
+    def clone(self):
+        return ZoneDef(self.rect.copy())
+
+    def mirrored(self, world_w: int):
+        return ZoneDef(_mirror_rect(self.rect, world_w))
+
+    def build(self):
+        return ControlZone(self.rect)
+
+
+#
+# Events
+#
+# An event (events.py) with its actions compiled to (op, args) pairs. Source form:
+#   {"on": "enter", "rect": [x, y, w, h], "once": true, "do": [["message", "Hi.", 1.0], ...]}
+#   {"on": "jump", "at": 3, ...}      the 3rd jump ("at" left out: every jump)
+#   {"on": "timer", "at": 12.5, ...}  level clock in seconds
+#   {"on": "start", ...} / {"on": "goal", ...}
+# "once" defaults to true, except for jump events. Actions and their arguments:
+#   ["invert", on]                          force inverted controls on/off
+#   ["message", text, seconds=1.0]
+#   ["trigger", group, indices=null, aim=false]   group: falling, rising or sliding; null: all
+#   ["cycle", [group, ...], aim=false]      the next spike of the groups each time
+#   ["arm_spikes", on=true]                 ground spikes
+#   ["move_goal", [x, y]]
+#   ["add_spikes", [[x, y, w, h], ...]]
+#   ["hold_exit"]                           (goal events) this touch doesn't finish the level
+
+_EVENT_KEYS = {"on", "rect", "at", "once", "do"}
+_MOVE_GOAL = ACTION_OPS["move_goal"]
+
+
+class EventDef:
+    __slots__ = ("kind", "rect", "at", "once", "actions")
+
+    def __init__(self, kind: int, rect, at, once: bool, actions: tuple):
+        self.kind = kind
+        self.rect = rect  # enter events
+        self.at = at  # jump number (0: every jump) or timer time
+        self.once = once
+        self.actions = actions  # ((op, args), ...); never modified
+
+    def clone(self):
+        rect = None if self.rect is None else self.rect.copy()
+        return EventDef(self.kind, rect, self.at, self.once, self.actions)
+
+    def mirrored(self, world_w: int):
+        # Added spikes are kept where they are, as mirror mode always has
+        actions = tuple(
+            (op, ((world_w - args[0][0], args[0][1]),)) if op == _MOVE_GOAL else (op, args)
+            for op, args in self.actions
+        )
+        rect = None if self.rect is None else _mirror_rect(self.rect, world_w)
+        return EventDef(self.kind, rect, self.at, self.once, actions)
+
+
+def _action(item, where: str) -> tuple:
+    if not isinstance(item, (list, tuple)) or not item or item[0] not in ACTION_OPS:
+        raise ValueError(f"{where}: expected [action, args...] with a known action, got {item!r}")
+    name, args = item[0], list(item[1:])
+
+    def arg(k, default=None):
+        return args[k] if k < len(args) else default
+
+    def groups(gs):
+        if not isinstance(gs, (list, tuple)):
+            raise ValueError(f"{where}: expected a list of spike groups, got {gs!r}")
+        for g in gs:
+            if not isinstance(g, str) or g not in SPIKE_GROUPS:
+                raise ValueError(f"{where}: unknown spike group {g!r}")
+        return tuple(gs)
+
+    def indices(ks):
+        if ks is None:
+            return None
+        if (not isinstance(ks, (list, tuple))
+                or not all(isinstance(k, int) and not isinstance(k, bool) and k >= 0 for k in ks)):
+            raise ValueError(f"{where}: expected a list of spike indices, got {ks!r}")
+        return tuple(ks)
+
+    if name == "invert":
+        out = (bool(arg(0, True)),)
+    elif name == "message":
+        out = (_text(arg(0, ""), f"{where}: text"), float(_number(arg(1, 1.0), f"{where}: seconds")))
+    elif name == "trigger":
+        out = (groups([arg(0)])[0], indices(arg(1)), bool(arg(2, False)))
+    elif name == "cycle":
+        out = (groups(arg(0, ())), bool(arg(1, False)))
+    elif name == "arm_spikes":
+        out = (bool(arg(0, True)),)
+    elif name == "move_goal":
+        out = (_point(arg(0), where),)
+    elif name == "add_spikes":
+        out = (tuple(tuple(_rect(r, where)) for r in _list(arg(0, ()), where)),)
+    else:  # hold_exit
+        out = ()
+    if len(args) > len(out):
+        raise ValueError(f"{where}: too many arguments for {name!r}")
+    return (ACTION_OPS[name], out)
+
+
+def _event(src, where: str) -> EventDef:
+    if not isinstance(src, dict) or src.get("on") not in EVENT_KINDS:
+        raise ValueError(f"{where}: expected an object with 'on' one of {sorted(EVENT_KINDS)}")
+    unknown = set(src) - _EVENT_KEYS
+    if unknown:
+        raise ValueError(f"{where}: unknown keys {sorted(unknown)}")
+    kind = EVENT_KINDS[src["on"]]
+    rect = _rect(src.get("rect"), where) if kind == EV_ENTER else None
+    at = src.get("at", 0)
+    if not isinstance(at, (int, float)) or at < 0 or (kind == EV_TIMER and "at" not in src):
+        raise ValueError(f"{where}: 'at' must be a jump number or a time in seconds, got {at!r}")
+    once = bool(src.get("once", kind != EV_JUMP))
+    actions = tuple(_action(a, f"{where}: do[{k}]") for k, a in enumerate(_list(src.get("do", []), f"{where}: do")))
+    return EventDef(kind, rect, at, once, actions)
+
+
+#
+# Compatibility: pre-"events" level sources
+#
+# Before levels listed their events, traps came from fixed names: "triggers"
+# entries like ["DROP_SPIKES", rect], the "rules" flags and the exit-reset
+# keys of "goal_rules" (reset_on_touch, reset_to, add_spikes). The shipped
+# levels no longer use them; older sources still load because the names are
+# rewritten into the events they stood for (and come before the level's own
+# "events"). Don't add new names here: write the events in the level.
+
+_LEGACY_TRIGGERS = {
+    "INVERT_ON": [["invert", True], ["message", "NOPE (controls).", 0.8]],
+    "INVERT_OFF": [["invert", False], ["message", "Okay fine.", 0.7]],
+    "DROP_SPIKES": [["trigger", "falling"], ["message", "Too late.", 0.8]],
+    "SLIDE_SPIKES": [["trigger", "sliding"], ["message", "RUN.", 0.7]],
+}
+_LEGACY_RULES = {"ground_spikes_arm_on_jump", "jump_trap_sequence", "trap_every_jump"}
+
+
+def _legacy_events(src: dict, name: str) -> list:
+    # "rules", "triggers" and the exit-reset goal_rules as (where, event source) pairs
+    events = []
+
+    rules = _section(src, "rules", dict, name)
+    unknown = set(rules) - _LEGACY_RULES
+    if unknown:
+        raise ValueError(f"{name}: rules: unknown keys {sorted(unknown)}")
+    if rules.get("ground_spikes_arm_on_jump"):
+        # ground spikes are harmless until the first jump (and re-armed on every jump)
+        events.append((f"{name}: rules", {"on": "start", "do": [["arm_spikes", False]]}))
+        events.append((f"{name}: rules", {"on": "jump", "do": [["arm_spikes", True]]}))
+    if rules.get("jump_trap_sequence"):
+        # traps drop/rise where the player is heading
+        if rules.get("trap_every_jump"):
+            events.append((f"{name}: rules", {"on": "jump", "do": [["cycle", ["falling", "rising"], True]]}))
+        else:
+            for n, (group, k) in enumerate((("falling", 0), ("falling", 1), ("rising", 0)), 1):
+                events.append((f"{name}: rules", {"on": "jump", "at": n, "do": [["trigger", group, [k], True]]}))
+
+    for i, (action, rect) in enumerate(_entries(src, "triggers", 2, name)):
+        if not isinstance(action, str) or action not in _LEGACY_TRIGGERS:
+            raise ValueError(f"{name}: triggers[{i}]: unknown trigger {action!r}")
+        events.append((f"{name}: triggers[{i}]", {"on": "enter", "rect": rect, "do": _LEGACY_TRIGGERS[action]}))
+
+    gr = _section(src, "goal_rules", dict, name)
+    if gr.get("reset_on_touch"):
+        # the first touch doesn't count: the exit moves and spikes appear
+        do = []
+        if gr.get("reset_to"):
+            do += [["move_goal", gr["reset_to"]], ["message", "The exit moved. Obviously.", 1.1]]
+        if gr.get("add_spikes"):
+            do.append(["add_spikes", gr["add_spikes"]])
+        do.append(["hold_exit"])
+        events.append((f"{name}: goal_rules", {"on": "goal", "do": do}))
+    return events
+
+
+#
+# Goal
+
+class GoalDef:
+    __slots__ = ("rect", "run_away", "teleport_to", "patrol")
+
+    def __init__(self, rect: pg.Rect, run_away: bool = False, teleport_to=None, patrol=None):
+        self.rect = rect
+        self.run_away = run_away
+        self.teleport_to = teleport_to  # (x, y) the door jumps to on first touch
+        self.patrol = patrol  # (x1, x2, speed) back and forth at the door's height
+
+    def clone(self):
+        return GoalDef(self.rect.copy(), self.run_away, self.teleport_to, self.patrol)
+
+    def mirrored(self, world_w: int):
+        teleport_to = self.teleport_to
+        if teleport_to is not None:
+            teleport_to = (world_w - teleport_to[0], teleport_to[1])
+        patrol = self.patrol
+        if patrol is not None:
+            a, b, spd = patrol
+            patrol = (world_w - a, world_w - b, spd)
+        return GoalDef(_mirror_rect(self.rect, world_w), self.run_away, teleport_to, patrol)
+
+
+class LevelDef:
+    __slots__ = (
+        "name", "world", "spawn", "goal",
+        "platforms", "spikes", "sliding_spikes", "falling_spikes", "rising_spikes",
+        "signs", "control_zones", "events", "colliders",
+    )
+
+    def __init__(self, name: str, world: tuple, spawn: tuple, goal: GoalDef,
+                 platforms: list, spikes: list, sliding_spikes: list, falling_spikes: list,
+                 rising_spikes: list, signs: list, control_zones: list, events: list,
+                 colliders: list | None = None):
+        self.name = name
+        self.world = world
+        self.spawn = spawn
+        self.goal = goal
+        self.platforms = platforms
+        self.spikes = spikes
+        self.sliding_spikes = sliding_spikes
+        self.falling_spikes = falling_spikes
+        self.rising_spikes = rising_spikes
+        self.signs = signs
+        self.control_zones = control_zones
+        self.events = events
+        # (box, platform position) collision boxes for the static solids; never modified
+        self.colliders = static_colliders(platforms) if colliders is None else colliders
+
+    def clone(self) -> LevelDef:
+        # Fresh Rects everywhere, so a built level never moves the definition's
+        return LevelDef(
+            self.name, self.world, self.spawn, self.goal.clone(),
+            [p.clone() for p in self.platforms],
+            [s.clone() for s in self.spikes],
+            [s.clone() for s in self.sliding_spikes],
+            [s.clone() for s in self.falling_spikes],
+            [s.clone() for s in self.rising_spikes],
+            [s.clone() for s in self.signs],
+            [z.clone() for z in self.control_zones],
+            [e.clone() for e in self.events],
+            self.colliders,
+        )
+
+    def mirrored(self) -> LevelDef:
+        # Flipped left <-> right
+        w = self.world[0]
+        sx, sy = self.spawn
+        return LevelDef(
+            self.name, self.world, (w - sx, sy), self.goal.mirrored(w),
+            [p.mirrored(w) for p in self.platforms],
+            [s.mirrored(w) for s in self.spikes],
+            [s.mirrored(w) for s in self.sliding_spikes],
+            [s.mirrored(w) for s in self.falling_spikes],
+            [s.mirrored(w) for s in self.rising_spikes],
+            [s.mirrored(w) for s in self.signs],
+            [z.mirrored(w) for z in self.control_zones],
+            [e.mirrored(w) for e in self.events],
+            [(_mirror_rect(box, w), i) for box, i in self.colliders],
+        )
+
+
+#
+# Compiling a source dict
+
+_LEVEL_KEYS = {
+    "name", "world", "spawn", "goal", "rules", "goal_rules", "platforms", "spikes",
+    "sliding_spikes", "falling_spikes", "rising_spikes", "signs", "control_zones", "triggers", "events",
+}
+_REQUIRED_KEYS = ("world", "spawn", "goal")
+_GOAL_RULES = {"run_away", "teleport_once", "patrol", "reset_on_touch", "reset_to", "add_spikes"}
+
+
+def _section(src: dict, key: str, kind: type, name: str):
+    # src[key] (or an empty one), checked to be a list or an object
+    v = src.get(key, kind())
+    if not isinstance(v, kind):
+        raise ValueError(f"{name}: {key}: expected {'a list' if kind is list else 'an object'}, got {v!r}")
+    return v
+
+
+def _entries(src: dict, key: str, size: int, name: str) -> list:
+    items = _section(src, key, list, name)
+    for i, it in enumerate(items):
+        if not isinstance(it, (list, tuple)) or len(it) != size:
+            raise ValueError(f"{name}: {key}[{i}]: expected {size} values, got {it!r}")
+    return items
+
+
+def _patrol(v, where: str) -> tuple:
+    if (not isinstance(v, (list, tuple)) or len(v) != 3
+            or not all(isinstance(x, (int, float)) and not isinstance(x, bool) for x in v)):
+        raise ValueError(f"{where}: expected [x1, x2, speed], got {v!r}")
+    return tuple(v)
+
+
+def compile_level(src: dict) -> LevelDef:
+    # src: plain JSON values (lists for rects and points). Raises ValueError if malformed.
+    if not isinstance(src, dict):
+        raise ValueError(f"expected a level object, got {type(src).__name__}")
+    name = src.get("name", "?")
+    unknown = set(src) - _LEVEL_KEYS
+    if unknown:
+        raise ValueError(f"{name}: unknown keys {sorted(unknown)}")
+    missing = [k for k in _REQUIRED_KEYS if k not in src]
+    if missing:
+        raise ValueError(f"{name}: missing keys {missing}")
+
+    platforms = []
+    for i, item in enumerate(_section(src, "platforms", list, name)):
+        where = f"{name}: platforms[{i}]"
+        if not isinstance(item, (list, tuple)) or len(item) != 2:
+            raise ValueError(f"{where}: expected [kind, payload]")
+        kind, payload = item
+        cls = PLATFORM_KINDS.get(kind) if isinstance(kind, str) else None
+        if cls is None:
+            raise ValueError(f"{where}: unknown platform kind {kind!r}")
+        platforms.append(cls.from_json(payload, where))
+
+    events = [_event(e, where) for where, e in _legacy_events(src, name)]
+    events += [_event(e, f"{name}: events[{i}]") for i, e in enumerate(_section(src, "events", list, name))]
+
+    gr = _section(src, "goal_rules", dict, name)
+    unknown = set(gr) - _GOAL_RULES
+    if unknown:
+        raise ValueError(f"{name}: unknown goal rules {sorted(unknown)}")
+    patrol = gr.get("patrol")
+    goal = GoalDef(
+        _rect(src["goal"], f"{name}: goal"),
+        run_away=bool(gr.get("run_away", False)),
+        teleport_to=_point(gr["teleport_once"], f"{name}: teleport_once") if "teleport_once" in gr else None,
+        patrol=_patrol(patrol, f"{name}: patrol") if patrol is not None else None,
+    )
+
+    return LevelDef(
+        name,
+        _point(src["world"], f"{name}: world"),
+        _point(src["spawn"], f"{name}: spawn"),
+        goal,
+        platforms,
+        [SpikeDef(_rect(r, f"{name}: spikes")) for r in _section(src, "spikes", list, name)],
+        [SlidingSpikeDef(_rect(r, name), _point(v, f"{name}: sliding_spikes"))
+         for r, v in _entries(src, "sliding_spikes", 2, name)],
+        [FallingSpikeDef(_rect(r, name), _number(s, f"{name}: falling_spikes"))
+         for r, s in _entries(src, "falling_spikes", 2, name)],
+        [RisingSpikeDef(_rect(r, name), _number(s, f"{name}: rising_spikes"))
+         for r, s in _entries(src, "rising_spikes", 2, name)],
+        [SignDef(_rect(r, name), _text(t, f"{name}: signs")) for r, t in _entries(src, "signs", 2, name)],
+        [ZoneDef(_rect(r, f"{name}: control_zones")) for r in _section(src, "control_zones", list, name)],
+        events,
+    )
@@ -5,390 +5,520 @@
 from __future__ import annotations
 import pygame as pg
 
-from settings import WIDTH, HEIGHT, FPS, TITLE, BG, WHITE, ACCENT
+from settings import (
+    WIDTH, HEIGHT, FPS, SIM_DT, MAX_FRAME_TIME,
+    DIRTY_RECTS, RENDER_BACKEND, RENDER_DRIVER,
+    TITLE, WHITE, ACCENT,
+)
 from entities import (
     Player, Camera,
-    Platform, FakePlatform, InvisiblePlatform, FallingPlatform, MovingPlatform, ConveyorPlatform, BouncePlatform,
     Spike, SlidingSpike, FallingSpike, RisingSpike,
     Goal, Sign,
-    TriggerZone, ControlZone,
+    TriggerZone,
+    StaticCollider,
 )
-from level_data import build_levels, mirror_level
+from level_data import load_levels, LevelVariants
+from level_schema import LevelDef
+from spatial import SpatialHash
+from hazards import HazardField
+from render_cache import StaticLayer, DirtyRenderer
+from streaming import WorldStream
+from contacts import ContactManager
+from events import EventEngine, EV_START, EV_ENTER, EV_JUMP, EV_GOAL
+from sprites import render_text
+from inputs import encode_keys
+from replay import Recorder
 
 
 DEV_MODE = True
 
+# Moves larger than this between two sim steps are teleports and are not interpolated
+SNAP_DIST = 200
 
-def _rect_copy(r):
-    return r.copy() if isinstance(r, pg.Rect) else pg.Rect(r)
-
-
-def clone_level_def(d: dict) -> dict:
-    # Make fresh Rects so a restarted level doesn't keep moved trap positions.
-    out = dict(d)
-
-    out["spawn"] = tuple(d["spawn"])
-    out["world"] = tuple(d["world"])
-    out["goal"] = _rect_copy(d["goal"])
-
-    plats = []
-    for item in d.get("platforms", []):
-        kind = item[0]
-
-        if kind in ("solid", "fake", "falling", "invisible"):
-            _, rect = item
-            plats.append((kind, _rect_copy(rect)))
-
-        elif kind == "moving":
-            _, (rect, a, b, speed) = item
-            plats.append((kind, (_rect_copy(rect), tuple(a), tuple(b), speed)))
-
-        elif kind == "conveyor":
-            _, payload = item
-            rect, speed = payload[0], payload[1]
-            if len(payload) >= 3:
-                plats.append((kind, (_rect_copy(rect), speed, payload[2])))
-            else:
-                plats.append((kind, (_rect_copy(rect), speed)))
-
-        elif kind == "bounce":
-            _, (rect, strength) = item
-            plats.append((kind, (_rect_copy(rect), strength)))
-
-        else:
-            plats.append(item)
-
-    out["platforms"] = plats
-
-    out["spikes"] = [_rect_copy(r) for r in d.get("spikes", [])]
-    out["sliding_spikes"] = [(_rect_copy(r), tuple(v)) for (r, v) in d.get("sliding_spikes", [])]
-    out["falling_spikes"] = [(_rect_copy(r), spd) for (r, spd) in d.get("falling_spikes", [])]
-    out["rising_spikes"] = [(_rect_copy(r), spd) for (r, spd) in d.get("rising_spikes", [])]
-
-    out["signs"] = [(_rect_copy(r), text) for (r, text) in d.get("signs", [])]
-    out["triggers"] = [(name, _rect_copy(r)) for (name, r) in d.get("triggers", [])]
-    out["control_zones"] = [_rect_copy(r) for r in d.get("control_zones", [])]
-
-    out["rules"] = dict(d.get("rules", {}))
-    out["goal_rules"] = dict(d.get("goal_rules", {}))
-    return out
+# Entry kinds in Level.stream (indices into the level definition's lists)
+STREAM_PLATFORM, STREAM_COLLIDER, STREAM_TRIGGER, STREAM_ZONE = range(4)
 
 
 class Level:
-    def __init__(self, level_def: dict, mirrored: bool = False):
-        level_def = clone_level_def(level_def)
+    def __init__(self, level_def: LevelDef, mirrored: bool = False):
+        # Fresh Rects, so playing the level never moves the shared definition's
+        level_def = level_def.clone()
 
         self.defn = level_def
-        self.name = level_def["name"] + (" [MIRRORED]" if mirrored else "")
-        self.world_w, self.world_h = level_def["world"]
+        self.name = level_def.name + (" [MIRRORED]" if mirrored else "")
+        self.world_w, self.world_h = level_def.world
 
-        sx, sy = level_def["spawn"]
+        sx, sy = level_def.spawn
         self.player = Player(sx, sy)
 
         # object lists (updated/drawn each frame)
         self.platforms: list = []
+
+        # every spike lives in one struct-of-arrays field; the lists below hold handles
+        self.hazards = HazardField()
         self.spikes: list[Spike] = []
         self.sliding_spikes: list[SlidingSpike] = []
         self.falling_spikes: list[FallingSpike] = []
         self.rising_spikes: list[RisingSpike] = []
 
         self.signs: list[Sign] = []
-        self.triggers: list[TriggerZone] = []
-        self.control_zones: list[ControlZone] = []
+
+        # trigger and control zones, found by overlap with the player (see zone pass in update)
+        self.zone_index = SpatialHash()
+        self.contacts = ContactManager()
 
         # control gimmick
         self.controls_inverted = False
         self._invert_forced = False
+        self._invert_zones = 0  # control zones the player is in (ControlZone contact events)
 
         # small on-screen message
         self.msg = ""
         self.msg_t = 0.0
 
+        # broadphase for player vs platform collision
+        self.platform_index = SpatialHash()
+
+        # player moves longer than this are split into substeps (see Player._move_and_collide);
+        # at least 1, so a zero-size platform can't make the substep count divide by zero
+        self.thinnest = max(1, min((min(pd.rect.size) for pd in level_def.platforms), default=self.player.rect.h))
+
         self.camera = Camera(self.world_w, self.world_h)
-        self._goal_reset_done = False
+        self.camera.update(self.player.rect, WIDTH, HEIGHT)  # start on the player (streaming loads around it)
 
-        rules = level_def.get("rules", {})
-        self.ground_spikes_arm_on_jump = rules.get("ground_spikes_arm_on_jump", False)
-        self.jump_trap_sequence = rules.get("jump_trap_sequence", False)
-        self._jump_trap_index = 0
+        # sim time since the level started; platforms move as functions of it (motion.py)
+        self.clock = 0.0
 
-        self._build(level_def)
+        # positions before the last sim step, used to interpolate drawing
+        self._prev_rects: list = []
+        self._prev_cam = (0.0, 0.0)
 
-        if self.ground_spikes_arm_on_jump:
-            for s in self.spikes:
-                s.active = False
-
-    def _build(self, d: dict):
-        # Platforms
-        for item in d["platforms"]:
-            kind = item[0]
-
-            if kind == "solid":
-                _, rect = item
-                self.platforms.append(Platform(rect))
-            elif kind == "fake":
-                _, rect = item
-                self.platforms.append(FakePlatform(rect))
-            elif kind == "falling":
-                _, rect = item
-                self.platforms.append(FallingPlatform(rect))
-            elif kind == "invisible":
-                _, rect = item
-                self.platforms.append(InvisiblePlatform(rect))
-            elif kind == "moving":
-                _, (rect, a, b, speed) = item
-                self.platforms.append(MovingPlatform(rect, a, b, speed))
-            elif kind == "conveyor":
-                _, payload = item
-                rect, speed = payload[0], payload[1]
-                boost = payload[2] if len(payload) >= 3 else 1.0
-                self.platforms.append(ConveyorPlatform(rect, speed, boost=boost))
-            elif kind == "bounce":
-                _, (rect, strength) = item
-                self.platforms.append(BouncePlatform(rect, strength=strength))
+        # level events (zones, jumps, the exit, timers) and what they do, see events.py
+        self.events = EventEngine(level_def.events)
+
+        self._build(level_def)
 
+        # Static geometry is pre-rendered in world tiles (see render_cache.StaticLayer).
+        # Tiles draw by key: platforms in list order (key = index), then spikes on top.
+        self.static_layer = StaticLayer(self.world_w, self.world_h)
+        for k in range(len(self.spikes)):
+            self.bake_spike(k)
+
+        # Signs draw above moving platforms and traps, so they get their own see-through layer
+        self.sign_layer = StaticLayer(self.world_w, self.world_h, transparent=True)
+        for k, sign in enumerate(self.signs):
+            self.sign_layer.add(sign, order=len(level_def.platforms) + len(self.spikes) + k)
+
+        self.events.emit(self, EV_START)
+
+        # Platforms, collision boxes, triggers and control zones only exist near the
+        # player and camera (see streaming.py). The slots map definition index -> platform;
+        # self.platforms is rebuilt from them whenever something loads or unloads.
+        self._platform_slots: dict = {}
+        self.stream = WorldStream([
+            (self._make_platform, self._attach_platform, self._detach_platform),
+            (self._make_collider, self._attach_collider, self._detach_collider),
+            (self._make_trigger, self._attach_trigger, self._detach_zone),
+            (self._make_zone, self._attach_zone, self._detach_zone),
+        ])
+        for i, pd in enumerate(level_def.platforms):
+            self.stream.add(STREAM_PLATFORM, i, pd.bounds())
+        for i, (box, _) in enumerate(level_def.colliders):
+            self.stream.add(STREAM_COLLIDER, i, box)
+        for i, e in enumerate(level_def.events):
+            if e.kind == EV_ENTER:
+                self.stream.add(STREAM_TRIGGER, i, e.rect)
+        for i, z in enumerate(level_def.control_zones):
+            self.stream.add(STREAM_ZONE, i, z.rect)
+        self._stream_update(force=True)
+
+        self._initial_state = self.snapshot()
+
+    def _build(self, d: LevelDef):
         # Hazards
-        for rect in d.get("spikes", []):
-            self.spikes.append(Spike(rect, active=True))
-
-        for rect, vel in d.get("sliding_spikes", []):
-            self.sliding_spikes.append(SlidingSpike(rect, vel))
-
-        for rect, speed in d.get("falling_spikes", []):
-            self.falling_spikes.append(FallingSpike(rect, drop_speed=speed))
-
-        for rect, speed in d.get("rising_spikes", []):
-            self.rising_spikes.append(RisingSpike(rect, rise_speed=speed))
-
-        # Signs / zones
-        for rect, text in d.get("signs", []):
-            self.signs.append(Sign(rect, text))
-
-        for z in d.get("control_zones", []):
-            self.control_zones.append(ControlZone(z))
-
-        # Triggers are small “if player enters rect, do something once” zones
-        for name, rect in d.get("triggers", []):
-            if name == "INVERT_ON":
-                def inv_on(level):
-                    level._invert_forced = True
-                    level.flash_msg("NOPE (controls).", 0.8)
-                self.triggers.append(TriggerZone(rect, inv_on, once=True))
-
-            elif name == "INVERT_OFF":
-                def inv_off(level):
-                    level._invert_forced = False
-                    level.flash_msg("Okay fine.", 0.7)
-                self.triggers.append(TriggerZone(rect, inv_off, once=True))
-
-            elif name == "DROP_SPIKES":
-                def drop_spikes(level):
-                    for fs in level.falling_spikes:
-                        fs.trigger(level)
-                    level.flash_msg("Too late.", 0.8)
-                self.triggers.append(TriggerZone(rect, drop_spikes, once=True))
-
-            elif name == "SLIDE_SPIKES":
-                def slide_spikes(level):
-                    for ss in level.sliding_spikes:
-                        ss.trigger(level)
-                    level.flash_msg("RUN.", 0.7)
-                self.triggers.append(TriggerZone(rect, slide_spikes, once=True))
+        hz = self.hazards
+        self.spikes = [s.build(hz) for s in d.spikes]
+        self.sliding_spikes = [s.build(hz) for s in d.sliding_spikes]
+        self.falling_spikes = [s.build(hz) for s in d.falling_spikes]
+        self.rising_spikes = [s.build(hz) for s in d.rising_spikes]
+
+        # Signs
+        self.signs = [s.build() for s in d.signs]
 
         # Goal (door)
-        self.goal = Goal(d["goal"])
-        gr = d.get("goal_rules", {})
-        if gr.get("run_away", False):
-            self.goal.run_away = True
-        if "teleport_once" in gr:
+        gd = d.goal
+        self.goal = Goal(gd.rect)
+        self.goal.run_away = gd.run_away
+        if gd.teleport_to is not None:
             self.goal.teleport_once = True
-            self.goal.teleport_to = gr["teleport_once"]
-        if "patrol" in gr:
-            x1, x2, spd = gr["patrol"]
+            self.goal.teleport_to = gd.teleport_to
+        if gd.patrol is not None:
+            x1, x2, spd = gd.patrol
             y = self.goal.rect.y
             self.goal.patrol = True
             self.goal.patrol_a = (x1, y)
             self.goal.patrol_b = (x2, y)
             self.goal.patrol_speed = spd
 
-    def flash_msg(self, text: str, t: float = 1.0):
-        self.msg = text
-        self.msg_t = t
-
-    def on_player_jump(self):
-        # Some levels arm ground spikes only after the first jump.
-        if self.ground_spikes_arm_on_jump:
-            for s in self.spikes:
-                s.active = True
+    #
+    # World streaming
 
-        # Some levels trigger traps based on jump count.
-        if not self.jump_trap_sequence:
+    def _stream_update(self, force: bool = False):
+        area = self.camera.view_rect.union(self.player.rect)
+        if not self.stream.update(area) and not force:
             return
-
-        trap_every = self.defn.get("rules", {}).get("trap_every_jump", False)
-        px = self.player.rect.centerx + int(self.player.vel.x * 0.10)
-
-        nf = len(self.falling_spikes)
-        nr = len(self.rising_spikes)
-        if nf == 0 and nr == 0:
+        slots = self._platform_slots
+        self.platforms = [slots[i] for i in sorted(slots) if not slots[i].dead]
+
+    def _make_platform(self, i: int):
+        return self.defn.platforms[i].build()
+
+    def _attach_platform(self, i: int, p):
+        # Catch up on whatever happened while it was asleep (or not loaded yet).
+        # Plain solid platforms collide through merged boxes (level_schema.merge_boxes),
+        # everything else through itself. Index order is the platform list order.
+        p.seek(self.clock, self)
+        if p.dead:
             return
+        self._platform_slots[i] = p
+        if not self.defn.platforms[i].static_solid:
+            self.platform_index.insert(p, order=i)
+        if p.baked:
+            self.static_layer.add(p, order=i)
+
+    def _detach_platform(self, i: int, p):
+        self._platform_slots.pop(i, None)
+        self.platform_index.remove(p)
+        if p.baked:
+            self.static_layer.remove(p)
+
+    def bake_spike(self, k: int):
+        # Spike k of self.spikes into the static layer, above every platform
+        self.static_layer.add(self.spikes[k], order=len(self.defn.platforms) + k)
+
+    def _make_collider(self, i: int):
+        return StaticCollider(self.defn.colliders[i][0])
+
+    def _attach_collider(self, i: int, c):
+        self.platform_index.insert(c, order=self.defn.colliders[i][1])
+
+    def _detach_collider(self, i: int, c):
+        self.platform_index.remove(c)
+
+    def _make_zone(self, i: int):
+        return self.defn.control_zones[i].build()
+
+    def _attach_trigger(self, i: int, tz):
+        # Triggers fire in definition order when entered on the same step
+        self.zone_index.insert(tz, order=i)
+
+    def _attach_zone(self, i: int, z):
+        self.zone_index.insert(z, order=len(self.defn.events) + i)
+
+    def _detach_zone(self, i: int, z):
+        self.zone_index.remove(z)
+
+    def _make_trigger(self, i: int) -> TriggerZone:
+        # Zone that fires enter event i
+        e = self.defn.events[i]
+        return TriggerZone(e.rect, i, once=e.once)
+
+    #
+    # Savestates
+    #
+    # A snapshot is plain data (tuples/lists) describing everything update() can
+    # change. restore() writes it back into the existing objects, so restarting
+    # never rebuilds the level.
+
+    def snapshot(self):
+        return (
+            self.player.snapshot(),
+            self.stream.snapshot(),
+            len(self.spikes),
+            self.hazards.snapshot(),
+            self.goal.snapshot(),
+            self.events.snapshot(),
+            (
+                self.clock,
+                self.controls_inverted, self._invert_forced,
+                self.msg, self.msg_t,
+            ),
+            (self.camera.offset.x, self.camera.offset.y),
+        )
+
+    def restore(self, state):
+        (
+            player, streamed, n_spikes, hazards,
+            goal, events, flags, cam,
+        ) = state
+
+        self.player.restore(player)
+        self.events.restore(events)
+        (
+            self.clock,
+            self.controls_inverted, self._invert_forced,
+            self.msg, self.msg_t,
+        ) = flags
+
+        # Contacts start over: whatever the player is touching begins again next step
+        self.contacts.clear()
+        self._invert_zones = 0
+
+        # Platforms and triggers (loaded ones are reset in place, see WorldStream.restore)
+        self.stream.restore(streamed)
+
+        # Spikes added after the snapshot (add_spikes events) are dropped
+        for s in self.spikes[n_spikes:]:
+            self.static_layer.remove(s)
+        del self.spikes[n_spikes:]
+        self.hazards.restore(hazards)
+
+        self.goal.restore(goal)
+        self.camera.offset.update(cam)
+        self._stream_update(force=True)
+
+        # Movers just follow the clock
+        for p in self.platforms:
+            p.seek(self.clock, self)
+            if p.dynamic:
+                self.platform_index.update(p)
+        self._prev_rects = []
 
-        if trap_every:
-            cycle_len = nf + nr
-            idx = self._jump_trap_index % cycle_len
-
-            if idx < nf:
-                self.falling_spikes[idx].trigger(self, px)
-            else:
-                rs = self.rising_spikes[idx - nf]
-                rs.rect.centerx = px
-                rs.rect.x = max(0, min(rs.rect.x, self.world_w - rs.rect.w))
-                rs.trigger(self)
+    def restart(self):
+        # Back to how the level was right after it was built
+        self.restore(self._initial_state)
 
-            self._jump_trap_index += 1
-            return
-
-        i = self._jump_trap_index
-        if i == 0 and nf >= 1:
-            self.falling_spikes[0].trigger(self, px)
-        elif i == 1 and nf >= 2:
-            self.falling_spikes[1].trigger(self, px)
-        elif i == 2 and nr >= 1:
-            rs = self.rising_spikes[0]
-            rs.rect.centerx = px
-            rs.rect.x = max(0, min(rs.rect.x, self.world_w - rs.rect.w))
-            rs.trigger(self)
+    def flash_msg(self, text: str, t: float = 1.0):
+        self.msg = text
+        self.msg_t = t
 
-        self._jump_trap_index += 1
+    def on_player_jump(self):
+        self.events.emit(self, EV_JUMP)
 
     def handle_goal_touch(self) -> bool:
-        # This lets a level “troll” once: teleport the door, spawn spikes, etc.
-        gr = self.defn.get("goal_rules", {})
+        # False if a goal event held the exit (the first touch of a "troll" door, ...)
+        return not self.events.emit(self, EV_GOAL)
 
-        if gr.get("reset_on_touch", False) and (not self._goal_reset_done):
-            self._goal_reset_done = True
+    def step(self, dt: float, keys) -> bool:
+        # One sim step plus the goal check. Returns True once the level is complete.
+        self.update(dt, keys)
 
-            to = gr.get("reset_to")
-            if to:
-                self.goal.rect.topleft = to
-                self.flash_msg("The exit moved. Obviously.", 1.1)
+        if (not self.player.dead) and self.goal.reached(self.player):
+            self.goal.on_touch(self)
+            return self.handle_goal_touch()
+        return False
 
-            for x, y, w, h in gr.get("add_spikes", []):
-                self.spikes.append(Spike(pg.Rect(x, y, w, h), active=True))
+    def _moving_rects(self) -> list:
+        # Everything whose position can change during a sim step
+        rects = [self.player.rect, self.goal.rect]
+        rects.extend(p.rect for p in self.platforms if p.dynamic)
+        return rects
 
-            return False
+    def update(self, dt: float, keys):
+        # Load what came near, drop what is far away (see streaming.py)
+        self._stream_update()
 
-        return True
+        # Remember where things were, so draw() can blend towards the new state
+        self._prev_rects = [(r, r.x, r.y) for r in self._moving_rects()]
+        self._prev_cam = (self.camera.offset.x, self.camera.offset.y)
+        self.hazards.save_prev()
+        self.clock += dt
 
-    def update(self, dt: float, keys):
         # Message timer
         if self.msg_t > 0:
             self.msg_t -= dt
             if self.msg_t <= 0:
                 self.msg = ""
 
-        # Control zones invert movement while inside
-        zone_inv = any(z.rect.colliderect(self.player.rect) for z in self.control_zones)
-        self.controls_inverted = self._invert_forced or zone_inv
+        # Timed events
+        self.events.update(self)
 
         # Update platforms first (moving platforms need to move before player collision)
+        index = self.platform_index
         for p in self.platforms:
             p.update(dt, self)
-        self.platforms = [p for p in self.platforms if not p.dead]
+            if p.dynamic:
+                index.update(p)
+
+        alive = []
+        for p in self.platforms:
+            if p.dead:
+                index.remove(p)
+            else:
+                alive.append(p)
+        self.platforms = alive
 
         self.player.update(dt, keys, self)
 
         # When dead: show death screen, restart only with R (handled in main loop)
         if self.player.dead:
+            self.contacts.update(self, self.player)
             return
 
-        # Hazards
-        for s in self.spikes:
-            s.check(self.player)
-
-        for s in self.sliding_spikes:
-            s.update(dt, self)
-            s.check(self.player)
+        # Hazards: move triggered spikes, then one batched overlap test
+        self.hazards.seek(self.clock)
+        if self.hazards.hits(self.player.rect):
+            self.player.kill("Spikes.")
 
-        for fs in self.falling_spikes:
-            fs.update(dt, self)
-            fs.check(self.player)
-
-        for rs in self.rising_spikes:
-            rs.update(dt, self)
-            rs.check(self.player)
-
-        # Trigger zones
-        for tz in self.triggers:
-            tz.update(self)
+        # Trigger and control zones the player is in; then fire this step's contact events
+        pr = self.player.rect
+        for z in self.zone_index.query(pr):
+            if z.rect.colliderect(pr):
+                self.contacts.touch(z)
+        self.contacts.update(self, self.player)
+        self.controls_inverted = self._invert_forced or self._invert_zones > 0
 
         # Goal + camera
         self.goal.update(dt, self)
         self.camera.update(self.player.rect, WIDTH, HEIGHT)
 
-    def draw(self, screen: pg.Surface, font_big, font_small):
-        screen.fill(BG)
+    def draw(self, screen: pg.Surface, font_big, font_small, alpha: float = 1.0, renderer=None):
+        # alpha: how far the display time is between the previous and the current sim step.
+        # renderer: optional DirtyRenderer. Returns the screen rects to present, or None
+        # if the whole screen was redrawn (then flip).
+        if alpha >= 1.0 or not self._prev_rects:
+            return self._draw(screen, font_big, font_small, renderer)
+
+        # Temporarily move things to their interpolated positions, draw, then put them back
+        current = [(r, r.x, r.y) for (r, _, _) in self._prev_rects]
+        for r, px, py in self._prev_rects:
+            if abs(r.x - px) <= SNAP_DIST and abs(r.y - py) <= SNAP_DIST:
+                r.topleft = (round(px + (r.x - px) * alpha), round(py + (r.y - py) * alpha))
+
+        spikes_now = self.hazards.interpolate(alpha, SNAP_DIST)
+
+        cam = self.camera.offset
+        cam_now = (cam.x, cam.y)
+        pcx, pcy = self._prev_cam
+        if abs(cam.x - pcx) <= SNAP_DIST and abs(cam.y - pcy) <= SNAP_DIST:
+            cam.update(pcx + (cam.x - pcx) * alpha, pcy + (cam.y - pcy) * alpha)
+
+        try:
+            return self._draw(screen, font_big, font_small, renderer)
+        finally:
+            for r, x, y in current:
+                r.topleft = (x, y)
+            self.hazards.undo_interpolate(spikes_now)
+            cam.update(cam_now)
+
+    def _draw(self, screen: pg.Surface, font_big, font_small, renderer=None):
+        # Static platforms and ground spikes come from pre-rendered tiles
+        layer = self.static_layer
+        if layer.version != self.hazards.version:
+            layer.invalidate()
+            layer.version = self.hazards.version
+
+        if renderer is not None:
+            return renderer.draw(self, screen, font_big, font_small)
+
+        layer.draw(screen, self.camera, font_small)
+        self.draw_dynamic(screen, font_big, font_small)
+        return None
+
+    def visible_items(self) -> list:
+        # Platforms, moving spikes and the goal on screen, in draw order.
+        # The index buckets use un-interpolated positions, so query a slightly larger area.
+        view = self.camera.view_rect
+        near = view.inflate(2 * SNAP_DIST, 2 * SNAP_DIST)
+
+        items = [p for p in self.platform_index.query(near) if not p.baked and p.rect.colliderect(view)]
+        items += self.hazards.visible(view, moving_only=True)
+        if self.goal.rect.colliderect(view):
+            items.append(self.goal)
+        return items
+
+    def hud(self, font_big, font_small) -> list:
+        # (text surface, screen position) pairs drawn over everything
+        out = [(render_text(font_small, self.name, (210, 210, 210)), (16, 12))]
 
-        for p in self.platforms:
-            p.draw(screen, self.camera)
+        if self.controls_inverted:
+            out.append((render_text(font_small, "CONTROLS INVERTED", (255, 160, 160)), (16, 92)))
 
-        for s in self.spikes:
-            s.draw(screen, self.camera)
-        for s in self.sliding_spikes:
-            s.draw(screen, self.camera)
-        for s in self.falling_spikes:
-            s.draw(screen, self.camera)
-        for s in self.rising_spikes:
-            s.draw(screen, self.camera)
+        if self.player.dead:
+            m1 = render_text(font_big, "YOU DIED", (255, 95, 110))
+            out.append((m1, (WIDTH // 2 - m1.get_width() // 2, HEIGHT // 2 - 80)))
+            m2 = render_text(font_small, self.player.death_reason, WHITE)
+            out.append((m2, (WIDTH // 2 - m2.get_width() // 2, HEIGHT // 2 - 30)))
+            m3 = render_text(font_small, "Press R to retry", ACCENT)
+            out.append((m3, (WIDTH // 2 - m3.get_width() // 2, HEIGHT // 2 + 10)))
 
-        self.goal.draw(screen, self.camera)
+        if self.msg:
+            m = render_text(font_small, self.msg, ACCENT)
+            out.append((m, (WIDTH // 2 - m.get_width() // 2, 120)))
 
-        for sign in self.signs:
-            sign.draw(screen, self.camera, font_small)
+        return out
 
-        self.player.draw(screen, self.camera)
+    def draw_dynamic(self, screen: pg.Surface, font_big, font_small, restored: list | None = None) -> list:
+        # Everything that isn't in the static layer. Returns the screen rects drawn.
+        # restored: rects a dirty-rect renderer just repainted from the background
+        # (signs only need redrawing there; otherwise the whole sign layer is drawn).
+        cam = self.camera
+        drawn = []
 
-        screen.blit(font_small.render(self.name, True, (210, 210, 210)), (16, 12))
+        for it in self.visible_items():
+            r = it.draw(screen, cam)
+            if r is not None:
+                drawn.append(r)
 
-        if self.controls_inverted:
-            screen.blit(font_small.render("CONTROLS INVERTED", True, (255, 160, 160)), (16, 92))
+        if restored is None:
+            self.sign_layer.draw(screen, cam, font_small)
+        else:
+            self.sign_layer.draw(screen, cam, font_small, clip_rects=restored + drawn)
 
-        if self.player.dead:
-            m1 = font_big.render("YOU DIED", True, (255, 95, 110))
-            screen.blit(m1, (WIDTH // 2 - m1.get_width() // 2, HEIGHT // 2 - 80))
-            m2 = font_small.render(self.player.death_reason, True, WHITE)
-            screen.blit(m2, (WIDTH // 2 - m2.get_width() // 2, HEIGHT // 2 - 30))
-            m3 = font_small.render("Press R to retry", True, ACCENT)
-            screen.blit(m3, (WIDTH // 2 - m3.get_width() // 2, HEIGHT // 2 + 10))
+        drawn.append(self.player.draw(screen, cam))
 
-        if self.msg:
-            m = font_small.render(self.msg, True, ACCENT)
-            screen.blit(m, (WIDTH // 2 - m.get_width() // 2, 120))
+        for img, pos in self.hud(font_big, font_small):
+            drawn.append(screen.blit(img, pos))
+
+        return drawn
 
 
 class LevelManager:
-    def __init__(self):
-        self.base_levels = build_levels()
+    def __init__(self, record: bool = True):
+        self.base_levels = load_levels()  # only the index is read; levels load when selected
+        self.mirrored_levels = LevelVariants(self.base_levels, "mirror")  # built lazily, per level
         self.mirrored = False
 
         self.unlocked = len(self.base_levels) if DEV_MODE else 1
 
+        # every attempt is recorded as a replay (see replay.py)
+        self.record = record
+        self.recorder: Recorder | None = None
+
         self.index = 0
         self.levels = self.base_levels
+        self._load()
+
+    def _load(self):
+        # (Re)build the current level; this ends the previous attempt's recording
+        self.finish_recording()
         self.level = Level(self.levels[self.index], mirrored=self.mirrored)
+        self._start_recording()
+
+    def _start_recording(self):
+        if self.record:
+            self.recorder = Recorder(self.index, self.mirrored)
+
+    def finish_recording(self):
+        if self.recorder is not None:
+            self.recorder.save()
+            self.recorder = None
 
     def set_mode(self, mirrored: bool):
+        # O(1): nothing is mirrored or built until a level is actually selected
         self.mirrored = mirrored
-        self.levels = [mirror_level(l) for l in self.base_levels] if mirrored else self.base_levels
+        self.levels = self.mirrored_levels if mirrored else self.base_levels
         self.index = max(0, min(self.index, len(self.levels) - 1))
-        self.level = Level(self.levels[self.index], mirrored=self.mirrored)
 
     def select_level(self, idx: int):
         self.index = idx
-        self.level = Level(self.levels[self.index], mirrored=self.mirrored)
+        self._load()
 
     def restart_level(self):
-        self.level = Level(self.levels[self.index], mirrored=self.mirrored)
+        # Same level again: restore its initial savestate instead of rebuilding it
+        self.finish_recording()
+        self.level.restart()
+        self._start_recording()
 
     def mark_completed(self):
         if self.unlocked < self.index + 2:
@@ -410,15 +540,64 @@ class LevelManager:
 
 
 def draw_center(screen, font, text, y, color):
-    img = font.render(text, True, color)
+    img = render_text(font, text, color)
     screen.blit(img, (WIDTH // 2 - img.get_width() // 2, y))
 
 
+#
+# Menus
+#
+# Menus only change when a key is pressed, so they are drawn once and then the
+# loop blocks on events. Small changes (the mode toggle) update just their rect.
+
+MENU_BG = (10, 10, 14)
+MENU_WAIT_MS = 1000  # wake up at least this often, even with no input
+
+
+def draw_mode_line(screen, font, mgr) -> pg.Rect:
+    area = pg.Rect(0, 166, WIDTH, 30)
+    screen.fill(MENU_BG, area)
+    draw_center(screen, font, f"Mode: {'MIRRORED' if mgr.mirrored else 'NORMAL'}  (press M)", 170, (170, 170, 170))
+    return area
+
+
+def draw_select(screen, font_big, font_small, mgr):
+    screen.fill(MENU_BG)
+    draw_center(screen, font_big, "TRUST ISSUES", 80, ACCENT)
+    draw_center(screen, font_small, "Pick level: 1-9, 0=10, F1=11, F2=12", 140, (200, 200, 200))
+    draw_mode_line(screen, font_small, mgr)
+
+    y = 240
+    for i in range(len(mgr.base_levels)):
+        unlocked = mgr.can_play(i)
+        lock = "" if unlocked else "  [LOCKED]"
+        label = f"{i+1:02d}. {mgr.base_levels.name(i)}{lock}"
+        color = (230, 230, 230) if unlocked else (90, 90, 95)
+        screen.blit(render_text(font_small, label, color), (110, y))
+        y += 26
+
+    screen.blit(render_text(font_small, "Esc returns here", (150, 150, 150)), (110, HEIGHT - 70))
+
+
+def draw_complete(screen, font_big, font_small):
+    screen.fill(MENU_BG)
+    draw_center(screen, font_big, "LEVEL COMPLETE", HEIGHT // 2 - 140, (110, 255, 170))
+    draw_center(screen, font_small, "N = Next   R = Retry   Esc = Level Select", HEIGHT // 2 - 40, (220, 220, 220))
+
+
 def main():
     pg.init()
-    pg.display.set_caption(TITLE)
-    screen = pg.display.set_mode((WIDTH, HEIGHT))
+    if RENDER_BACKEND == "texture":
+        # Gameplay goes through SDL textures; menus draw into gpu.screen
+        from texture_render import TextureRenderer
+        gpu = TextureRenderer(TITLE, (WIDTH, HEIGHT), RENDER_DRIVER)
+        screen = gpu.screen
+    else:
+        gpu = None
+        pg.display.set_caption(TITLE)
+        screen = pg.display.set_mode((WIDTH, HEIGHT))
     clock = pg.time.Clock()
+    Player.build_atlas()
 
     font_big = pg.font.SysFont("consolas", 52, bold=True)
     font_small = pg.font.SysFont("consolas", 22, bold=True)
@@ -426,18 +605,71 @@ def main():
     mgr = LevelManager()
     state = "select"
 
+    # Simulation runs in fixed SIM_DT steps; the accumulator holds leftover frame time
+    acc = 0.0
+
+    # Gameplay: optionally repaint/present only what changed
+    if gpu is not None:
+        renderer = gpu
+    else:
+        renderer = DirtyRenderer() if DIRTY_RECTS else None
+
+    # Menus: repaint the whole screen only when this is set
+    menu_dirty = True
+    shown_state = None
+
     while True:
-        dt = clock.tick(FPS) / 1000.0
+        if state != shown_state:
+            menu_dirty = True
+            shown_state = state
+            if isinstance(renderer, DirtyRenderer):
+                renderer.invalidate()
+
+        if state == "play":
+            frame_t = min(clock.tick(FPS) / 1000.0, MAX_FRAME_TIME)
+            events = pg.event.get()
+        else:
+            if menu_dirty:
+                if state == "select":
+                    draw_select(screen, font_big, font_small, mgr)
+                else:
+                    draw_complete(screen, font_big, font_small)
+                if gpu is not None:
+                    gpu.present_surface()
+                else:
+                    pg.display.flip()
+                menu_dirty = False
+
+            # Nothing moves in menus: sleep until there is input
+            e = pg.event.wait(MENU_WAIT_MS)
+            events = pg.event.get()
+            if e.type != pg.NOEVENT:
+                events.insert(0, e)
+
+            # Don't let the idle time count as one huge frame once play starts
+            clock.tick()
+            frame_t = 0.0
+            acc = 0.0
+
         keys = pg.key.get_pressed()
 
-        for e in pg.event.get():
+        for e in events:
             if e.type == pg.QUIT:
+                mgr.finish_recording()
                 raise SystemExit
 
+            if e.type in (pg.VIDEOEXPOSE, pg.WINDOWEXPOSED):
+                menu_dirty = True
+
             if e.type == pg.KEYDOWN:
                 if state == "select":
                     if e.key == pg.K_m:
                         mgr.set_mode(not mgr.mirrored)
+                        band = draw_mode_line(screen, font_small, mgr)
+                        if gpu is not None:
+                            gpu.present_surface()
+                        else:
+                            pg.display.update(band)
 
                     if pg.K_1 <= e.key <= pg.K_9:
                         idx = e.key - pg.K_1
@@ -479,44 +711,26 @@ def main():
                     elif e.key == pg.K_ESCAPE:
                         state = "select"
 
-        if state == "select":
-            screen.fill((10, 10, 14))
-            draw_center(screen, font_big, "TRUST ISSUES", 80, ACCENT)
-            draw_center(screen, font_small, "Pick level: 1-9, 0=10, F1=11, F2=12", 140, (200, 200, 200))
-            draw_center(screen, font_small, f"Mode: {'MIRRORED' if mgr.mirrored else 'NORMAL'}  (press M)", 170, (170, 170, 170))
-
-            y = 240
-            for i, lv in enumerate(mgr.base_levels):
-                unlocked = mgr.can_play(i)
-                lock = "" if unlocked else "  [LOCKED]"
-                label = f"{i+1:02d}. {lv['name']}{lock}"
-                color = (230, 230, 230) if unlocked else (90, 90, 95)
-                screen.blit(font_small.render(label, True, color), (110, y))
-                y += 26
-
-            screen.blit(font_small.render("Esc returns here", True, (150, 150, 150)), (110, HEIGHT - 70))
-            pg.display.flip()
-            continue
-
         if state == "play":
-            mgr.level.update(dt, keys)
-
-            if (not mgr.level.player.dead) and mgr.level.goal.reached(mgr.level.player):
-                mgr.level.goal.on_touch(mgr.level)
-                if mgr.level.handle_goal_touch():
+            mask = encode_keys(keys)
+            acc += frame_t
+            while acc >= SIM_DT:
+                acc -= SIM_DT
+                if mgr.recorder is not None:
+                    mgr.recorder.record(mask)
+                if mgr.level.step(SIM_DT, keys):
                     mgr.mark_completed()
                     state = "complete"
-
-            mgr.level.draw(screen, font_big, font_small)
-            pg.display.flip()
-            continue
-
-        if state == "complete":
-            screen.fill((10, 10, 14))
-            draw_center(screen, font_big, "LEVEL COMPLETE", HEIGHT // 2 - 140, (110, 255, 170))
-            draw_center(screen, font_small, "N = Next   R = Retry   Esc = Level Select", HEIGHT // 2 - 40, (220, 220, 220))
-            pg.display.flip()
-            continue
+                    acc = 0.0
+                    break
+
+            dirty = mgr.level.draw(screen, font_big, font_small, alpha=acc / SIM_DT, renderer=renderer)
+            if gpu is not None:
+                gpu.present()
+            elif dirty is None:
+                pg.display.flip()
+            else:
+                pg.display.update(dirty)
 
 
 if __name__ == "__main__":
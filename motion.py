@@ -0,0 +1,48 @@
+# motion.py
+# Movement as closed-form functions of time.
+#
+# Anything that moves on its own (moving and falling platforms, the patrolling
+# door; spikes do the same in hazards.py) works out its position from the level
+# clock instead of stepping it frame by frame.
+# The same call gives the position a step later or a minute later, so a thing
+# that was asleep far from the player can be put exactly where a full
+# simulation would have it.
+
+from __future__ import annotations
+
+import math
+
+
+# The level clock is a running sum of float steps, so it can reach t0 + delay a
+# hair before or after the step it should. Delays are compared with this much
+# slack, so a delay of n steps always ends on the nth step.
+CLOCK_EPS = 1e-9
+
+
+def due(t: float, t0: float, delay: float) -> bool:
+    # Has delay passed since t0?
+    return t - t0 >= delay - CLOCK_EPS
+
+
+def ping_pong(x0: float, y0: float, ax: float, ay: float, bx: float, by: float, dist: float) -> tuple[float, float]:
+    # Point dist px along the path start -> b -> a -> b -> a ...
+    first = math.hypot(bx - x0, by - y0)
+    if dist < first:
+        f = dist / first
+        return x0 + (bx - x0) * f, y0 + (by - y0) * f
+
+    span = math.hypot(bx - ax, by - ay)
+    if span == 0:
+        return bx, by
+    legs, rest = divmod(dist - first, span)
+    f = rest / span
+    if legs % 2 == 0:  # b -> a
+        return bx + (ax - bx) * f, by + (ay - by) * f
+    return ax + (bx - ax) * f, ay + (by - ay) * f
+
+
+def fall_distance(gravity: float, t: float) -> float:
+    # Distance fallen from rest after t seconds (0 before it starts)
+    if t <= 0:
+        return 0.0
+    return 0.5 * gravity * t * t
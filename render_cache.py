@@ -0,0 +1,181 @@
+# render_cache.py
+# Pre-rendered surfaces, so per-frame drawing is mostly blits.
+
+from __future__ import annotations
+
+from collections import OrderedDict
+
+import pygame as pg
+
+from settings import BG
+from entities import Camera, Sign
+from spatial import SpatialHash
+
+
+#
+# Static world layer
+#
+# Static platforms, signs and static spikes are drawn once into CHUNK_SIZE world
+# tiles. Drawing the world is then a few blits of the tiles the camera can see.
+# Tiles are built lazily the first time they are on screen, and only the
+# CHUNK_CACHE_SIZE most recently seen are kept (worlds can be very wide).
+#
+# A transparent layer (used for signs, which draw on top of moving things) keeps
+# per-pixel alpha and skips tiles with nothing in them.
+
+CHUNK_SIZE = 512
+CHUNK_CACHE_SIZE = 32
+
+
+class StaticLayer:
+    def __init__(self, world_w: int, world_h: int, chunk_size: int = CHUNK_SIZE, transparent: bool = False):
+        self.world_w = world_w
+        self.world_h = world_h
+        self.chunk_size = chunk_size
+        self.transparent = transparent
+
+        self.index = SpatialHash(chunk_size)  # baked items, bucketed by tile
+        self.chunks: OrderedDict[tuple[int, int], pg.Surface | None] = OrderedDict()  # None = nothing baked there
+        self.version = None  # whatever the owner uses to notice content changes
+        self.generation = 0  # bumped on any change to what the layer draws
+
+        # reused for drawing into a tile: a camera whose offset is the tile origin
+        self._cam = Camera(world_w, world_h)
+
+    def add(self, item, order: int | None = None):
+        # item: anything with .rect and draw(surf, cam) (signs: draw(surf, cam, font)).
+        # order: draw key; tiles draw items with lower keys first, whatever order they
+        # were added in (default: after everything added so far)
+        self.index.insert(item, order=order)
+        self.invalidate(item.rect)
+
+    def remove(self, item):
+        rect = item.rect
+        self.index.remove(item)
+        self.invalidate(rect)
+
+    def invalidate(self, rect: pg.Rect | None = None):
+        # Drop cached tiles under rect (or all of them); they rebuild when next visible
+        self.generation += 1
+        if rect is None:
+            self.chunks.clear()
+            return
+        cs = self.chunk_size
+        for cx in range(rect.left // cs, (rect.right - 1) // cs + 1):
+            for cy in range(rect.top // cs, (rect.bottom - 1) // cs + 1):
+                self.chunks.pop((cx, cy), None)
+
+    def _build(self, cx: int, cy: int, font) -> pg.Surface | None:
+        cs = self.chunk_size
+        area = pg.Rect(cx * cs, cy * cs, cs, cs)
+        # in draw-key order (the index sorts query results by it)
+        items = [it for it in self.index.query(area) if it.rect.colliderect(area)]
+        if not items:
+            return None
+
+        if self.transparent:
+            surf = pg.Surface((cs, cs), pg.SRCALPHA)
+            if pg.display.get_surface() is not None:
+                surf = surf.convert_alpha()
+            surf.fill((0, 0, 0, 0))
+        else:
+            surf = pg.Surface((cs, cs))
+            if pg.display.get_surface() is not None:
+                surf = surf.convert()
+            surf.fill(BG)
+
+        cam = self._cam
+        cam.offset.update(area.x, area.y)
+        for it in items:
+            if isinstance(it, Sign):
+                it.draw(surf, cam, font)
+            else:
+                it.draw(surf, cam)
+        return surf
+
+    def tiles(self, cam: Camera, size: tuple[int, int], font):
+        # (tile surface or None, screen position) for every tile overlapping the view
+        cs = self.chunk_size
+        ox = int(cam.offset.x)
+        oy = int(cam.offset.y)
+        sw, sh = size
+
+        chunks = self.chunks
+        for cx in range(ox // cs, (ox + sw - 1) // cs + 1):
+            for cy in range(oy // cs, (oy + sh - 1) // cs + 1):
+                key = (cx, cy)
+                if key in chunks:
+                    chunks.move_to_end(key)
+                    surf = chunks[key]
+                else:
+                    surf = chunks[key] = self._build(cx, cy, font)
+                    if len(chunks) > CHUNK_CACHE_SIZE:
+                        chunks.popitem(last=False)
+                yield surf, (cx * cs - ox, cy * cs - oy)
+
+    def draw(self, screen: pg.Surface, cam: Camera, font, clip_rects: list | None = None):
+        # clip_rects: only repaint these screen rects (dirty-rect rendering)
+        cs = self.chunk_size
+        for surf, pos in self.tiles(cam, screen.get_size(), font):
+            if clip_rects is not None:
+                if surf is None:
+                    continue
+                tile = pg.Rect(pos, (cs, cs))
+                for r in clip_rects:
+                    part = tile.clip(r)
+                    if part:
+                        screen.blit(surf, part.topleft, part.move(-pos[0], -pos[1]))
+            elif surf is not None:
+                screen.blit(surf, pos)
+            elif not self.transparent:
+                screen.fill(BG, (pos, (cs, cs)))
+
+
+#
+# Dirty-rect gameplay renderer
+#
+# While the camera stands still (e.g. clamped at a world edge) the static layer
+# on screen doesn't change. Then only the areas where dynamic things were drawn
+# last frame are restored from a cached background, dynamic things are redrawn,
+# and just those rects are presented with pg.display.update(rects).
+
+class DirtyRenderer:
+    def __init__(self):
+        self.background: pg.Surface | None = None
+        self._bg_valid = False
+        self._level = None
+        self._key = None
+        self._prev: list | None = None  # rects drawn last frame
+
+    def invalidate(self):
+        # Next frame is a full repaint (call after anything else drew on the screen)
+        self._prev = None
+
+    def draw(self, level, screen: pg.Surface, font_big, font_small) -> list | None:
+        # Returns the rects to present, or None when the whole screen was repainted
+        cam = level.camera
+        layer = level.static_layer
+        key = (int(cam.offset.x), int(cam.offset.y), layer.generation, screen.get_size())
+
+        if self._prev is None or level is not self._level or key != self._key:
+            self._level = level
+            self._key = key
+            self._bg_valid = False
+            layer.draw(screen, cam, font_small)
+            self._prev = level.draw_dynamic(screen, font_big, font_small)
+            return None
+
+        if not self._bg_valid:
+            if self.background is None or self.background.get_size() != screen.get_size():
+                self.background = pg.Surface(screen.get_size()).convert(screen)
+            layer.draw(self.background, cam, font_small)
+            self._bg_valid = True
+
+        bg = self.background
+        prev = self._prev
+        for r in prev:
+            screen.blit(bg, r, r)
+
+        drawn = level.draw_dynamic(screen, font_big, font_small, restored=prev)
+        self._prev = drawn
+        return prev + drawn
@@ -0,0 +1,223 @@
+# replay.py
+# Compact input recordings: one key bitmask per sim tick, run-length encoded on save.
+#
+#   python replay.py replays/some_attempt.tir               # headless, as fast as possible
+#   python replay.py replays/some_attempt.tir --window      # watch it (add --speed 4 to fast-forward)
+
+from __future__ import annotations
+
+import os
+import struct
+import time
+
+from settings import SIM_HZ
+from inputs import MaskKeys
+
+
+REPLAY_DIR = "replays"
+REPLAY_EXT = ".tir"
+
+MAGIC = b"TIRP"
+VERSION = 1
+
+# magic, version, level index, flags (bit 0 = mirrored), sim hz, tick count
+_HEADER = struct.Struct("<4sBHBHI")
+_FLAG_MIRRORED = 1
+
+
+class Replay:
+    def __init__(self, level_index: int, mirrored: bool, masks: bytes | bytearray = b"", sim_hz: int = SIM_HZ):
+        self.level_index = level_index
+        self.mirrored = mirrored
+        self.sim_hz = sim_hz
+        self.masks = bytearray(masks)  # one byte per tick
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def __call__(self, tick: int) -> int:
+        # Usable directly as an input source (tick -> bitmask)
+        masks = self.masks
+        return masks[tick] if tick < len(masks) else 0
+
+    #
+    # Encoding
+    #
+    # Body is a list of runs: mask byte, then the run length as a varint.
+    # Held keys change a few times per second, so runs are long.
+
+    def to_bytes(self) -> bytes:
+        flags = _FLAG_MIRRORED if self.mirrored else 0
+        out = bytearray(_HEADER.pack(MAGIC, VERSION, self.level_index, flags, self.sim_hz, len(self.masks)))
+
+        masks = self.masks
+        n = len(masks)
+        i = 0
+        while i < n:
+            m = masks[i]
+            j = i + 1
+            while j < n and masks[j] == m:
+                j += 1
+            out.append(m)
+            _write_varint(out, j - i)
+            i = j
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        if len(data) < _HEADER.size:
+            raise ValueError("replay file is truncated")
+        magic, version, level_index, flags, sim_hz, ticks = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a replay file")
+        if version != VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+
+        masks = bytearray()
+        pos = _HEADER.size
+        while pos < len(data):
+            m = data[pos]
+            run, pos = _read_varint(data, pos + 1)
+            masks.extend(bytes((m,)) * run)
+        if len(masks) != ticks:
+            raise ValueError("replay body does not match its tick count")
+
+        return cls(level_index, bool(flags & _FLAG_MIRRORED), masks, sim_hz)
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def _write_varint(out: bytearray, n: int):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    n = 0
+    shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+class Recorder:
+    # Collects one mask per sim tick for the current attempt. record() is a single
+    # bytearray append; encoding and file I/O only happen in save().
+    def __init__(self, level_index: int, mirrored: bool):
+        self.replay = Replay(level_index, mirrored)
+        self._masks = self.replay.masks
+
+    def record(self, mask: int):
+        self._masks.append(mask)
+
+    @property
+    def ticks(self) -> int:
+        return len(self._masks)
+
+    def save(self, folder: str = REPLAY_DIR) -> str | None:
+        # Writes the attempt (if anything was played) and returns its path
+        if not self._masks:
+            return None
+        os.makedirs(folder, exist_ok=True)
+        r = self.replay
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        tag = "m" if r.mirrored else ""
+        base = os.path.join(folder, f"{stamp}-L{r.level_index + 1:02d}{tag}")
+        path = base + REPLAY_EXT
+        n = 1
+        while os.path.exists(path):
+            n += 1
+            path = f"{base}-{n}{REPLAY_EXT}"
+        r.save(path)
+        return path
+
+
+#
+# Playback
+
+def _level_for(replay: Replay):
+    from level_data import load_levels, mirror_level
+    from main import Level
+
+    d = load_levels()[replay.level_index]
+    if replay.mirrored:
+        d = mirror_level(d)
+    return Level(d, mirrored=replay.mirrored)
+
+
+def play_headless(replay: Replay):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from headless import run_level
+
+    return run_level(_level_for(replay), replay, len(replay), dt=1.0 / replay.sim_hz)
+
+
+def play_windowed(replay: Replay, speed: float = 1.0):
+    import pygame as pg
+    from settings import WIDTH, HEIGHT, FPS, MAX_FRAME_TIME, TITLE
+
+    pg.init()
+    pg.display.set_caption(TITLE + " - replay")
+    screen = pg.display.set_mode((WIDTH, HEIGHT))
+    clock = pg.time.Clock()
+    font_big = pg.font.SysFont("consolas", 52, bold=True)
+    font_small = pg.font.SysFont("consolas", 22, bold=True)
+
+    level = _level_for(replay)
+    dt = 1.0 / replay.sim_hz
+    keys = MaskKeys()
+    tick = 0
+    acc = 0.0
+    done = False
+
+    while True:
+        frame_t = min(clock.tick(FPS) / 1000.0, MAX_FRAME_TIME)
+        for e in pg.event.get():
+            if e.type == pg.QUIT or (e.type == pg.KEYDOWN and e.key == pg.K_ESCAPE):
+                return
+
+        acc += frame_t * speed
+        while acc >= dt and not done:
+            acc -= dt
+            keys.mask = replay(tick)
+            tick += 1
+            if level.step(dt, keys) or level.player.dead or tick >= len(replay):
+                done = True
+
+        level.draw(screen, font_big, font_small, alpha=1.0 if done else acc / dt)
+        pg.display.flip()
+
+
+def main():
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Play back a recorded attempt.")
+    ap.add_argument("path")
+    ap.add_argument("--window", action="store_true", help="watch the replay instead of running it headless")
+    ap.add_argument("--speed", type=float, default=1.0, help="playback speed when windowed")
+    args = ap.parse_args()
+
+    replay = Replay.load(args.path)
+    if args.window:
+        play_windowed(replay, args.speed)
+        return
+
+    r = play_headless(replay)
+    print(f"{r.name}: {r.outcome} after {r.ticks}/{len(replay)} ticks ({r.ticks_per_sec:.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,23 @@
 
 # Game dimensions and title
 WIDTH, HEIGHT = 1000, 600
-FPS = 60
+FPS = 60  # display frame cap (rendering only)
 TITLE = "Trust Issues - A Not-So-Friendly Platformer"
 
+# Fixed simulation step (physics no longer depends on the display frame rate)
+SIM_HZ = 60  # levels were tuned at 60 steps per second
+SIM_DT = 1.0 / SIM_HZ
+MAX_FRAME_TIME = 0.25  # longest frame the simulation will catch up on
+
+# Rendering
+DIRTY_RECTS = True  # gameplay: repaint/present only changed areas while the camera is still
+RENDER_BACKEND = "surface"  # "surface" (pg.display + blits) or "texture" (SDL renderer, texture_render.py)
+RENDER_DRIVER = None  # texture backend: SDL render driver, e.g. "software" for no GPU (None: SDL picks)
+
+# World streaming (streaming.py): entities exist only near the camera
+STREAM_CHUNK = 1024  # px, square world chunks
+STREAM_MARGIN = 512  # px around the camera view (and player) that is kept loaded
+
 # Physics settings
 GRAVITY = 2200.0  # Gravity affecting the player
 PLAYER_SPEED = 360.0  # Speed of the player
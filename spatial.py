@@ -0,0 +1,115 @@
+# spatial.py
+# Uniform-grid spatial hash used as a broadphase for anything with a .rect.
+
+from __future__ import annotations
+
+import pygame as pg
+
+
+CELL_SIZE = 256
+
+
+class SpatialHash:
+    # Buckets objects by the grid cells their rect overlaps.
+    # Queries return objects in insertion order, so collision passes resolve
+    # overlaps in the same order as a plain list loop would.
+    def __init__(self, cell_size: int = CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list] = {}
+        self._entries: dict[int, tuple[int, tuple, object]] = {}  # id(obj) -> (order, cell range, obj)
+        self._next_order = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, obj) -> bool:
+        return id(obj) in self._entries
+
+    def _cell_range(self, rect: pg.Rect) -> tuple[int, int, int, int]:
+        cs = self.cell_size
+        # right/bottom are exclusive, so a rect ending exactly on a cell edge
+        # does not spill into the next cell
+        x0 = rect.left // cs
+        y0 = rect.top // cs
+        return (
+            x0, y0,
+            max(x0, (rect.right - 1) // cs), max(y0, (rect.bottom - 1) // cs),
+        )
+
+    def insert(self, obj, order: int | None = None):
+        # order: query sort key; pass the old one to put a removed object back in place
+        key = id(obj)
+        if key in self._entries:
+            return
+        if order is None:
+            order = self._next_order
+        self._next_order = max(self._next_order, order + 1)
+        rng = self._cell_range(obj.rect)
+        self._entries[key] = (order, rng, obj)
+        self._add_cells(obj, rng)
+
+    def remove(self, obj):
+        entry = self._entries.pop(id(obj), None)
+        if entry is not None:
+            self._remove_cells(obj, entry[1])
+
+    def update(self, obj):
+        # Re-bucket an object after its rect moved. Cheap when it stayed
+        # inside the same cells, which is the common case for small movers.
+        entry = self._entries.get(id(obj))
+        if entry is None:
+            self.insert(obj)
+            return
+        order, old_rng, _ = entry
+        rng = self._cell_range(obj.rect)
+        if rng == old_rng:
+            return
+        self._remove_cells(obj, old_rng)
+        self._add_cells(obj, rng)
+        self._entries[id(obj)] = (order, rng, obj)
+
+    def clear(self):
+        self.cells.clear()
+        self._entries.clear()
+        self._next_order = 0
+
+    def query(self, rect: pg.Rect) -> list:
+        # Everything whose cells overlap rect (a superset of actual overlaps).
+        x0, y0, x1, y1 = self._cell_range(rect)
+        cells = self.cells
+
+        found = {}
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    for obj in bucket:
+                        found[id(obj)] = obj
+
+        if len(found) < 2:
+            return list(found.values())
+        entries = self._entries
+        return sorted(found.values(), key=lambda o: entries[id(o)][0])
+
+    def _add_cells(self, obj, rng):
+        x0, y0, x1, y1 = rng
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = [obj]
+                else:
+                    bucket.append(obj)
+
+    def _remove_cells(self, obj, rng):
+        x0, y0, x1, y1 = rng
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    continue
+                bucket.remove(obj)
+                if not bucket:
+                    del cells[(cx, cy)]
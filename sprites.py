@@ -0,0 +1,139 @@
+# sprites.py
+# Cached surfaces: rendered text (bounded LRU) and pre-drawn sprites.
+# Nothing here imports game objects, so entities.py can use it freely.
+
+from __future__ import annotations
+
+from collections import OrderedDict
+
+import pygame as pg
+
+from settings import RED
+
+#
+# Text
+#
+# font.render is one of the most expensive calls we make per frame, and the
+# strings (level names, signs, HUD, menus) almost never change.
+
+TEXT_CACHE_SIZE = 256
+
+
+class TextCache:
+    def __init__(self, maxsize: int = TEXT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def render(self, font: pg.font.Font, text: str, color, antialias: bool = True) -> pg.Surface:
+        key = (font, text, tuple(color), antialias)
+        items = self._items
+        img = items.get(key)
+        if img is not None:
+            items.move_to_end(key)
+            self.hits += 1
+            return img
+
+        self.misses += 1
+        img = font.render(text, antialias, color)
+        items[key] = img
+        if len(items) > self.maxsize:
+            items.popitem(last=False)
+        return img
+
+    def clear(self):
+        self._items.clear()
+
+
+text_cache = TextCache()
+
+
+def render_text(font: pg.font.Font, text: str, color, antialias: bool = True) -> pg.Surface:
+    # Drop-in for font.render(text, antialias, color); the returned surface is shared, don't draw on it
+    return text_cache.render(font, text, color, antialias)
+
+
+#
+# Spike teeth
+#
+# One surface per (size, orientation), drawn once and blitted after that.
+
+SPIKE_COLOR = RED
+SPIKE_EDGE = (255, 220, 220)
+
+_spike_sprites: dict[tuple[int, int, str], pg.Surface] = {}
+
+
+def spike_sprite(w: int, h: int, facing: str = "up") -> pg.Surface:
+    # facing: which way the teeth point ("up", "down", "left", "right")
+    key = (w, h, facing)
+    img = _spike_sprites.get(key)
+    if img is not None:
+        return img
+
+    if facing in ("left", "right"):
+        # draw as "up" in the rotated frame, then rotate into place
+        base = spike_sprite(h, w, "up")
+        img = pg.transform.rotate(base, 90 if facing == "left" else -90)
+    else:
+        # one extra row: the tooth bases sit on the line just below the rect
+        img = pg.Surface((w, h + 1), pg.SRCALPHA)
+        count = max(1, w // 16)
+        tw = w / count
+        for i in range(count):
+            x0 = i * tw
+            x1 = x0 + tw
+            mid = (x0 + x1) / 2
+            pg.draw.polygon(img, SPIKE_COLOR, [(x0, h), (x1, h), (mid, 0)])
+        pg.draw.rect(img, SPIKE_EDGE, (0, 0, w, h), 1)
+        if facing == "down":
+            img = pg.transform.flip(img, False, True)
+
+    _spike_sprites[key] = img
+    return img
+
+
+#
+# Conveyor arrows
+#
+# One strip per (belt width, direction). It holds an extra arrow period on the
+# left, so scrolling is just a different source area when blitting.
+
+ARROW_COLOR = (30, 30, 40)
+ARROW_PERIOD = 28  # px between arrows
+ARROW_H = 13
+
+_arrow_strips: dict[tuple[int, int], pg.Surface] = {}
+
+
+def conveyor_arrow_strip(w: int, direction: int) -> pg.Surface:
+    # direction: +1 arrows point right, -1 point left
+    key = (w, direction)
+    img = _arrow_strips.get(key)
+    if img is not None:
+        return img
+
+    P = ARROW_PERIOD
+    img = pg.Surface((w + P, ARROW_H), pg.SRCALPHA)
+    d = -10 * direction  # tip at x, base at x + d
+    cy = ARROW_H // 2
+    for x in range(12 - P, w - 12, P):
+        u = x + P
+        pg.draw.polygon(img, ARROW_COLOR, [(u, cy), (u + d, cy - 6), (u + d, cy + 6)])
+
+    _arrow_strips[key] = img
+    return img
+
+
+def draw_conveyor_arrows(surf: pg.Surface, r: pg.Rect, direction: int, scroll: float):
+    # r: belt rect in screen space. scroll: px the arrows have moved in their direction.
+    P = ARROW_PERIOD
+    strip = conveyor_arrow_strip(r.w, direction)
+    shift = int(scroll) % P if direction > 0 else -int(scroll) % P
+    # stay inside the 2px border
+    area = pg.Rect(P - shift + 2, 0, r.w - 4, ARROW_H)
+    surf.blit(strip, (r.left + 2, r.centery - ARROW_H // 2), area)
@@ -0,0 +1,142 @@
+# streaming.py
+# Keeps level entities alive only around the player and camera.
+#
+# The world is cut into STREAM_CHUNK squares and every streamed entry is listed
+# under each chunk its rect touches. An entry's entity exists only while one of
+# those chunks is within STREAM_MARGIN of the camera view (or the player). When
+# it is dropped, any state it picked up (a vanished fake platform, a used
+# trigger) is kept as a snapshot and put back when it is loaded again.
+#
+# Dropped entities sleep: nothing updates them. Everything that moves on its own
+# does so as a function of the level clock (motion.py), so the owner's attach()
+# seeks a freshly loaded entity to the current time and it is exactly where it
+# would have been had it stayed loaded.
+#
+# Spikes and signs are not streamed: they stay loaded for the whole level.
+# Spikes live in one HazardField (hazards.py), where seek() and hits() are each
+# a single NumPy pass over every spike, and signs are pre-rendered into a
+# static layer. Their memory and per-step cost still grow with the level size,
+# but only by a few array entries per spike.
+
+from __future__ import annotations
+
+import pygame as pg
+
+from settings import STREAM_CHUNK, STREAM_MARGIN
+
+
+class WorldStream:
+    def __init__(self, kinds: list, chunk_size: int = STREAM_CHUNK, margin: int = STREAM_MARGIN):
+        # kinds[k] = (make(i) -> entity, attach(i, entity), detach(i, entity)) for entry kind k
+        self.kinds = kinds
+        self.chunk_size = chunk_size
+        self.margin = margin
+
+        self.buckets: dict[tuple[int, int], list[tuple[int, int]]] = {}  # chunk -> entry keys
+        self.fixed: list[tuple[int, int]] = []  # entries that are always loaded
+        self._extent = None  # chunk range that has any entries
+
+        self.loaded: dict[tuple[int, int], object] = {}  # entry key (kind, i) -> entity
+        self.saved: dict[tuple[int, int], object] = {}  # snapshots of dropped entities that changed
+        self._fresh: dict[tuple[int, int], object] = {}  # snapshot of each loaded entity as built
+        self._range = None
+
+    def add(self, kind: int, i: int, rect: pg.Rect | None):
+        # rect None: always loaded
+        key = (kind, i)
+        if rect is None:
+            self.fixed.append(key)
+            return
+        x0, y0, x1, y1 = self._chunk_range(rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.buckets.setdefault((cx, cy), []).append(key)
+        if self._extent is not None:
+            ex0, ey0, ex1, ey1 = self._extent
+            x0, y0, x1, y1 = min(x0, ex0), min(y0, ey0), max(x1, ex1), max(y1, ey1)
+        self._extent = (x0, y0, x1, y1)
+
+    def _chunk_range(self, rect: pg.Rect) -> tuple[int, int, int, int]:
+        cs = self.chunk_size
+        return (
+            rect.left // cs, rect.top // cs,
+            max(rect.left, rect.right - 1) // cs, max(rect.top, rect.bottom - 1) // cs,
+        )
+
+    def update(self, area: pg.Rect) -> bool:
+        # Load/drop entries for the chunks around area. Returns True if anything changed.
+        m = self.margin
+        rng = self._chunk_range(area.inflate(2 * m, 2 * m))
+        if rng == self._range:
+            return False
+        self._range = rng
+
+        wanted = set(self.fixed)
+        buckets = self.buckets
+        x0, y0, x1, y1 = rng
+        if self._extent is not None:
+            ex0, ey0, ex1, ey1 = self._extent
+            x0, y0, x1, y1 = max(x0, ex0), max(y0, ey0), min(x1, ex1), min(y1, ey1)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                keys = buckets.get((cx, cy))
+                if keys:
+                    wanted.update(keys)
+
+        changed = False
+        for key in [k for k in self.loaded if k not in wanted]:
+            self._drop(key)
+            changed = True
+        for key in sorted(wanted.difference(self.loaded)):
+            self._load(key)
+            changed = True
+        return changed
+
+    def _load(self, key):
+        kind, i = key
+        make, attach, _ = self.kinds[kind]
+        ent = make(i)
+        if getattr(ent, "stateful", False):
+            self._fresh[key] = ent.snapshot()
+            state = self.saved.pop(key, None)
+            if state is not None:
+                ent.restore(state)
+        attach(i, ent)
+        self.loaded[key] = ent
+
+    def _drop(self, key):
+        ent = self.loaded[key]
+        kind, i = key
+        self.kinds[kind][2](i, ent)
+        del self.loaded[key]
+        fresh = self._fresh.pop(key, None)
+        if fresh is not None:
+            state = ent.snapshot()
+            if state != fresh:
+                self.saved[key] = state
+
+    #
+    # Savestates (see Level.snapshot)
+
+    def snapshot(self):
+        state = dict(self.saved)
+        for key, ent in self.loaded.items():
+            if key in self._fresh:
+                state[key] = ent.snapshot()
+        return state
+
+    def restore(self, state):
+        # Loaded entities are reset in place (so references to them stay valid);
+        # the rest get their snapshots back when they load. Call update() after.
+        state = dict(state)
+        for key, ent in self.loaded.items():
+            fresh = self._fresh.get(key)
+            if fresh is None:
+                continue
+            kind, i = key
+            _, attach, detach = self.kinds[kind]
+            detach(i, ent)
+            ent.restore(state.pop(key, fresh))
+            attach(i, ent)
+        self.saved = state
+        self._range = None
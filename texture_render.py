@@ -0,0 +1,132 @@
+# texture_render.py
+# Alternative gameplay renderer on pygame._sdl2.video (SDL_Renderer + textures).
+#
+# Everything the surface path blits from a cache (static layer tiles, platform
+# and spike sprites, the player atlas, text) is uploaded once as a Texture, so a
+# frame is just a list of texture copies. It works with any SDL render driver,
+# including "software" on machines without a GPU.
+
+from __future__ import annotations
+
+from collections import OrderedDict
+
+import pygame as pg
+from pygame._sdl2.video import Window, Renderer, Texture, get_drivers
+
+from settings import BG
+from entities import Camera, Player, Spike
+from sprites import spike_sprite
+
+
+TEXTURE_CACHE_SIZE = 512
+TILE_TEXTURE_CACHE_SIZE = 32  # static layer tiles are big; rebuilt tiles are new surfaces
+
+
+def driver_index(name: str | None) -> int:
+    # SDL render driver index for a name like "software" or "opengl" (-1: let SDL pick)
+    if name is None:
+        return -1
+    names = [d.name for d in get_drivers()]
+    if name not in names:
+        raise ValueError(f"render driver {name!r} not available (have: {', '.join(names)})")
+    return names.index(name)
+
+
+class TextureRenderer:
+    def __init__(self, title: str, size: tuple[int, int], driver: str | None = None, vsync: bool = False):
+        self.window = Window(title, size)
+        self.renderer = Renderer(self.window, index=driver_index(driver), vsync=vsync)
+
+        # Menus still draw with pygame.draw; they go here and present_surface() shows them
+        self.screen = pg.Surface(size)
+        self._screen_tex = Texture(self.renderer, size, streaming=True)
+
+        # key (a cached Surface itself, or a sprite key) -> Texture
+        self._textures: OrderedDict = OrderedDict()
+        self._tile_textures: OrderedDict = OrderedDict()
+
+        # reused for drawing a sprite: a camera whose offset is the item's position
+        self._sprite_cam = Camera(*size)
+
+    def texture(self, key, make=None, tile=False) -> Texture:
+        # Texture for a surface (key is the surface) or for the surface make() returns
+        textures, limit = (self._tile_textures, TILE_TEXTURE_CACHE_SIZE) if tile else (self._textures, TEXTURE_CACHE_SIZE)
+        tex = textures.get(key)
+        if tex is not None:
+            textures.move_to_end(key)
+            return tex
+
+        surf = key if make is None else make()
+        tex = textures[key] = Texture.from_surface(self.renderer, surf)
+        if len(textures) > limit:
+            textures.popitem(last=False)
+        return tex
+
+    def _sprite(self, item) -> Texture | None:
+        # Platforms and the goal: their own draw(), done once per sprite_key()
+        key = item.sprite_key()
+        if key is None:
+            return None
+
+        def make():
+            surf = pg.Surface(item.rect.size, pg.SRCALPHA)
+            cam = self._sprite_cam
+            cam.offset.update(item.rect.topleft)
+            item.draw(surf, cam)
+            return surf
+
+        return self.texture(key, make)
+
+    def draw(self, level, screen, font_big, font_small):
+        # Same interface as DirtyRenderer.draw (see Level.draw); screen is not used.
+        # The frame is shown by present().
+        r = self.renderer
+        r.draw_color = pg.Color(BG)
+        r.clear()
+
+        cam = level.camera
+        size = self.window.size
+        ox = int(cam.offset.x)
+        oy = int(cam.offset.y)
+
+        for surf, pos in level.static_layer.tiles(cam, size, font_small):
+            if surf is not None:
+                self.texture(surf, tile=True).draw(dstrect=pos)
+
+        for it in level.visible_items():
+            rect = it.rect
+            if isinstance(it, Spike):
+                tex = self.texture(spike_sprite(rect.w, rect.h))
+            else:
+                tex = self._sprite(it)
+                if tex is None:
+                    continue
+            tex.draw(dstrect=(rect.x - ox, rect.y - oy))
+
+        for surf, pos in level.sign_layer.tiles(cam, size, font_small):
+            if surf is not None:
+                self.texture(surf, tile=True).draw(dstrect=pos)
+
+        player = level.player
+        pad = Player._ATLAS_PAD
+        area = pg.Rect(player.frame_area())
+        self.texture(Player.build_atlas()).draw(
+            srcrect=area,
+            dstrect=(player.rect.x - ox - pad, player.rect.y - oy - pad, area.w, area.h),
+        )
+
+        for img, pos in level.hud(font_big, font_small):
+            self.texture(img).draw(dstrect=pos)
+
+        return None
+
+    def present(self):
+        self.renderer.present()
+
+    def present_surface(self, surf: pg.Surface | None = None):
+        # Show a software-drawn frame (defaults to self.screen)
+        tex = self._screen_tex
+        tex.update(self.screen if surf is None else surf)
+        self.renderer.clear()
+        tex.draw()
+        self.renderer.present()